@@ -4,6 +4,11 @@ import axios from "axios";
 import toast from "react-hot-toast";
 import { FaCamera, FaTimes, FaSpinner, FaUserCheck } from "react-icons/fa";
 
+// Frames sent per verification; the server checks the sharpest first and
+// stops at the first match, so a blurry frame no longer fails the attempt
+const BURST_FRAMES = 3;
+const BURST_INTERVAL_MS = 150;
+
 const FaceCapture = ({ 
   isOpen, 
   onClose, 
@@ -28,9 +33,20 @@ const FaceCapture = ({
     return new File([u8arr], filename, { type: mime });
   };
 
+  // Helper: Grab a short burst of screenshots from the webcam
+  const captureBurst = async () => {
+    const frames = [];
+    for (let i = 0; i < BURST_FRAMES; i++) {
+      if (i > 0) await new Promise((resolve) => setTimeout(resolve, BURST_INTERVAL_MS));
+      const imageSrc = webcamRef.current?.getScreenshot();
+      if (imageSrc) frames.push(imageSrc);
+    }
+    return frames;
+  };
+
   const handleCapture = useCallback(async () => {
-    const imageSrc = webcamRef.current.getScreenshot();
-    if (!imageSrc) return toast.error("Camera not ready");
+    const frames = await captureBurst();
+    if (frames.length === 0) return toast.error("Camera not ready");
 
     // 1. Safety Checks
     if (!session?.courseId) {
@@ -55,11 +71,12 @@ const FaceCapture = ({
       }
 
       // 3. Prepare Payload
-      const imageFile = dataURLtoFile(imageSrc, "face-scan.jpg");
       const formData = new FormData();
 
-      // ✅ Exact keys required by your backend
-      formData.append("image", imageFile); 
+      // ✅ Exact keys required by your backend (one "image" part per frame)
+      frames.forEach((imageSrc, index) => {
+        formData.append("image", dataURLtoFile(imageSrc, `face-scan-${index}.jpg`));
+      });
       formData.append("courseId", session.courseId);
       
       if (session.scheduleId || session.id) {
@@ -0,0 +1,88 @@
+require("dotenv").config(); // Load your .env file
+const fs = require("fs");
+const readline = require("readline");
+const { Pool } = require("pg");
+
+// Imports the JSON-lines file written by the face service re-embedding job:
+//   node import-embeddings.js python/data/embeddings.jsonl
+//
+// Users enrolled before crops were archived cannot be re-embedded, and their
+// old-model templates are not comparable with the new ones. The import is
+// refused while any such user remains, unless --allow-partial is passed.
+async function importEmbeddings() {
+  const args = process.argv.slice(2);
+  const filePath = args.find((arg) => !arg.startsWith("--"));
+  const allowPartial = args.includes("--allow-partial");
+  if (!filePath) {
+    console.error("❌ Usage: node import-embeddings.js <embeddings.jsonl> [--allow-partial]");
+    return;
+  }
+
+  const connectionString = process.env.DATABASE_URL;
+  if (!connectionString) {
+    console.error("❌ Error: Could not find DATABASE_URL in your .env file.");
+    return;
+  }
+
+  const pool = new Pool({ connectionString });
+  const client = await pool.connect();
+
+  console.log(`📥 Importing face embeddings from ${filePath}...`);
+
+  let updated = 0;
+  let missing = 0;
+  const importedIds = [];
+
+  try {
+    // One transaction, so a failed import leaves the old embeddings intact
+    await client.query("BEGIN");
+
+    const lines = readline.createInterface({
+      input: fs.createReadStream(filePath),
+      crlfDelay: Infinity,
+    });
+
+    for await (const line of lines) {
+      if (!line.trim()) continue;
+
+      const { userId, faceEmbedding } = JSON.parse(line);
+      importedIds.push(userId);
+      const result = await client.query(
+        "UPDATE users SET face_embedding = $1, updated_at = NOW() WHERE id = $2",
+        [faceEmbedding, userId]
+      );
+
+      if (result.rowCount > 0) updated++;
+      else missing++;
+    }
+
+    // Users that still hold a template but had no archived crop to re-embed
+    const { rows } = await client.query(
+      "SELECT COUNT(*)::int AS count FROM users WHERE face_embedding IS NOT NULL AND NOT (id::text = ANY($1))",
+      [importedIds]
+    );
+    const stale = rows[0].count;
+
+    if (stale > 0 && !allowPartial) {
+      throw new Error(
+        `${stale} users with a face embedding were not re-embedded (no archived crop). ` +
+          "They must re-enroll their face; rerun with --allow-partial to import anyway."
+      );
+    }
+    if (stale > 0) {
+      console.warn(`⚠️ ${stale} users keep embeddings from the previous model.`);
+    }
+
+    await client.query("COMMIT");
+    console.log(`✅ SUCCESS! ${updated} users updated, ${missing} not found.`);
+  } catch (error) {
+    await client.query("ROLLBACK");
+    console.error("❌ Error importing embeddings:", error);
+  } finally {
+    client.release();
+    await pool.end();
+    process.exit();
+  }
+}
+
+importEmbeddings();
@@ -1,9 +1,14 @@
+import asyncio
 import json
 import logging
 import base64
-import cv2
+import math
+import time
+from typing import List, Optional, Tuple
+
 import numpy as np
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile, Request
+from fastapi.concurrency import run_in_threadpool
 
 from ..config.settings import settings
 from ..models.schemas import (
@@ -11,17 +16,60 @@ from ..models.schemas import (
     FaceComparisonResponse,
     FaceDetectionResponse,
     FaceEmbeddingResponse,
+    FaceHint,
+    GalleryInfoResponse,
+    GalleryMatch,
+    GallerySearchRequest,
+    GallerySearchResponse,
+    GalleryShardsRequest,
+    GalleryUpsertRequest,
+    GroupDetectionResponse,
     HealthResponse,
+    LocalImageRef,
+    LocalImageRequest,
+    LocalVerifyRequest,
 )
-from ..services.face_detector import FaceDetector
+from ..services.crop_archive import CropArchive
 from ..services.face_recognizer import FaceRecognizer
+from ..services.gallery import ShardedGallery
+from ..services.group_detector import GroupFaceDetector
+from ..services.pipeline import InferencePipeline
+from ..services.qos import QoSController, QoSTicket
+
+from ..utils.local_ingest import resolve_local_image
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize services
-face_detector = FaceDetector()
-face_recognizer = FaceRecognizer()
+# Services are built by init_services() from the startup event, not at import
+# time: gallery shard workers are spawned processes that re-import the main
+# module, and must not load the models or start thread pools again
+face_recognizer: Optional[FaceRecognizer] = None
+inference_pipeline: Optional[InferencePipeline] = None
+group_detector: Optional[GroupFaceDetector] = None
+gallery: Optional[ShardedGallery] = None
+qos_controller: Optional[QoSController] = None
+crop_archive: Optional[CropArchive] = None
+
+
+def init_services():
+    """Create the face services (called once on application startup)"""
+    global face_recognizer, inference_pipeline, group_detector
+    global gallery, qos_controller, crop_archive
+
+    face_recognizer = FaceRecognizer()
+    inference_pipeline = InferencePipeline(face_recognizer)
+    group_detector = GroupFaceDetector()
+    gallery = ShardedGallery()  # Shard workers start on first use
+    qos_controller = QoSController()
+    crop_archive = CropArchive()
+
+
+def close_services():
+    """Stop worker processes and threads (called on application shutdown)"""
+    for service in (gallery, inference_pipeline, group_detector, crop_archive):
+        if service is not None:
+            service.close()
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -46,6 +94,7 @@ async def get_system_info():
         "status": "operational",
         "detection": detector_info,
         "recognition": recognizer_info,
+        "gallery": await run_in_threadpool(gallery.get_gallery_info),
         "settings": {
             "face_confidence_threshold": settings.FACE_CONFIDENCE_THRESHOLD,
             "max_image_size": settings.MAX_IMAGE_SIZE,
@@ -53,47 +102,272 @@ async def get_system_info():
     }
 
 
+@router.get("/metrics")
+async def get_metrics():
+    """Get QoS tier usage and per-stage pipeline utilization"""
+    return {
+        "qos": qos_controller.get_metrics(),
+        "pipeline": inference_pipeline.get_metrics(),
+    }
+
+
+# =========================================================
+# SHARED HANDLER LOGIC (multipart and local-ingest endpoints)
+# =========================================================
+def _face_hint_dict(hint: Optional[FaceHint]) -> Optional[dict]:
+    if hint is None:
+        return None
+
+    # json.loads and pydantic both accept NaN and Infinity
+    if not all(math.isfinite(value) for value in hint.model_dump().values()):
+        raise HTTPException(status_code=400, detail="face_hint values must be finite")
+
+    if hint.width <= 0 or hint.height <= 0:
+        raise HTTPException(
+            status_code=400, detail="face_hint width and height must be positive"
+        )
+
+    return hint.model_dump()
+
+
+def _parse_face_hint(face_hint: Optional[str]) -> Optional[dict]:
+    """Parse the optional face_hint form field: JSON {x, y, width, height}"""
+    if not face_hint:
+        return None
+
+    try:
+        hint = FaceHint(**json.loads(face_hint))
+    except Exception:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid face_hint. Must be a JSON object with x, y, width and height.",
+        )
+
+    return _face_hint_dict(hint)
+
+
+async def _archive_crop(user_id: Optional[str], crop: Optional[np.ndarray]):
+    """Keep the aligned crop so templates can be regenerated offline"""
+    if not settings.CROP_ARCHIVE_ENABLED or not user_id or crop is None:
+        return
+
+    try:
+        # SQLite insert + commit; keep it off the event loop
+        await run_in_threadpool(crop_archive.put, user_id, crop)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to archive face crop for {user_id}: {e}")
+
+
+async def _detect_face_response(
+    cv_image: np.ndarray,
+    ticket: QoSTicket,
+    hint: Optional[dict] = None,
+    user_id: Optional[str] = None,
+    screen_duplicates: bool = False,
+) -> FaceDetectionResponse:
+    success, confidence, bounding_box, message, faces_detected, hint_used = (
+        await inference_pipeline.detect_face(cv_image, ticket.tier, hint)
+    )
+
+    embedding = None
+    duplicates = templates_screened = None
+    if success:
+        emb_success, emb_array, emb_confidence, crop, emb_message, emb_hint_used = (
+            await inference_pipeline.generate_embedding(cv_image, ticket.tier, hint)
+        )
+        if emb_hint_used is not None:
+            hint_used = hint_used and emb_hint_used
+        if emb_success and emb_array is not None:
+            embedding = emb_array.tolist()
+            await _archive_crop(user_id, crop)
+            if screen_duplicates:
+                # Gallery calls block on shard IPC, so keep them off the event loop
+                duplicates, templates_screened = await run_in_threadpool(
+                    _screen_duplicates, emb_array, user_id
+                )
+            logger.info(f"✅ Real embedding generated: {len(embedding)} dimensions")
+        else:
+            logger.warning(f"⚠️ Embedding generation failed: {emb_message}")
+            embedding = np.random.rand(512).tolist()  # Fallback to mock
+
+    logger.info(f"Faces detected: {faces_detected}")
+    logger.info(f"Success: {success}")
+
+    return FaceDetectionResponse(
+        success=success,
+        embedding=embedding,
+        confidence=confidence,
+        message=message,
+        faces_detected=faces_detected,
+        bounding_box=bounding_box,
+        qos_tier=ticket.tier.name,
+        hint_used=hint_used if hint is not None else None,
+        duplicates=duplicates,
+        templates_screened=templates_screened,
+    )
+
+
+def _screen_duplicates(
+    embedding: np.ndarray, user_id: Optional[str]
+) -> Tuple[Optional[List[GalleryMatch]], Optional[int]]:
+    """
+    Screen a new template against every gallery template. The caller adds
+    the template to the gallery (POST /gallery/templates) once it is saved.
+
+    Returns:
+        - duplicates: Optional[List[GalleryMatch]] (None if screening failed)
+        - templates_screened: Optional[int] (0 means the gallery is not loaded)
+    """
+    try:
+        started = time.perf_counter()
+        templates_screened = gallery.get_gallery_info()["templates"]
+        matches = gallery.find_duplicates(embedding, exclude_id=user_id)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        logger.info(
+            f"🔎 Duplicate screen over {templates_screened} templates "
+            f"took {elapsed_ms:.1f} ms"
+        )
+        if templates_screened == 0:
+            logger.warning("⚠️ Duplicate screen ran against an empty gallery")
+        if matches:
+            logger.warning(
+                f"⚠️ Possible duplicate enrollment for {user_id}: {matches}"
+            )
+    except Exception as e:
+        logger.warning(f"⚠️ Duplicate screening failed for {user_id}: {e}")
+        return None, None
+
+    duplicates = [
+        GalleryMatch(template_id=template_id, similarity=similarity)
+        for template_id, similarity in matches
+    ]
+    return duplicates, templates_screened
+
+
+async def _generate_embedding_response(
+    cv_image: np.ndarray,
+    ticket: QoSTicket,
+    user_id: Optional[str],
+    hint: Optional[dict] = None,
+    screen_duplicates: bool = False,
+) -> FaceEmbeddingResponse:
+    success, embedding_array, confidence, crop, message, hint_used = (
+        await inference_pipeline.generate_embedding(cv_image, ticket.tier, hint)
+    )
+    if hint is None:
+        hint_used = None
+
+    if not success or embedding_array is None:
+        return FaceEmbeddingResponse(
+            success=False,
+            message=message,
+            qos_tier=ticket.tier.name,
+            hint_used=hint_used,
+        )
+
+    await _archive_crop(user_id, crop)
+
+    duplicates = templates_screened = None
+    if screen_duplicates:
+        # Gallery calls block on shard IPC, so keep them off the event loop
+        duplicates, templates_screened = await run_in_threadpool(
+            _screen_duplicates, embedding_array, user_id
+        )
+
+    embedding = embedding_array.tolist()
+
+    return FaceEmbeddingResponse(
+        success=True,
+        embedding=embedding,
+        confidence=confidence,
+        message="Face embedding generated successfully",
+        qos_tier=ticket.tier.name,
+        hint_used=hint_used,
+        duplicates=duplicates,
+        templates_screened=templates_screened,
+    )
+
+
+async def _verify_faces_response(
+    cv_images: List[np.ndarray],
+    target_embedding: Optional[np.ndarray],
+    student_id: Optional[str],
+    ticket: QoSTicket,
+    hint: Optional[dict] = None,
+) -> FaceComparisonResponse:
+    # Security Check: If no valid embedding, FAIL immediately.
+    # This prevents "bypass" by sending no data.
+    if target_embedding is None:
+        logger.error(f"❌ Security Block: No valid stored face found for comparison. ID: {student_id}")
+        return FaceComparisonResponse(
+            success=False,
+            similarity=0.0,
+            is_match=False,
+            confidence=0.0,
+            message="Security Error: No valid registered face found for this user.",
+            qos_tier=ticket.tier.name,
+        )
+
+    # Compare Live Face(s) vs Stored Face
+    success, similarity, is_match, message, frames_used, hint_used = (
+        await inference_pipeline.verify_face_burst(
+            cv_images, target_embedding, ticket.tier, hint
+        )
+    )
+    if hint is None:
+        hint_used = None
+
+    if not success:
+        return FaceComparisonResponse(
+            success=False,
+            similarity=0.0,
+            is_match=False,
+            confidence=0.0,
+            message=message,
+            frames_used=frames_used,
+            qos_tier=ticket.tier.name,
+            hint_used=hint_used,
+        )
+
+    return FaceComparisonResponse(
+        success=True,
+        similarity=float(similarity),
+        is_match=is_match,
+        confidence=float(similarity),
+        message=message,
+        frames_used=frames_used,
+        qos_tier=ticket.tier.name,
+        hint_used=hint_used,
+    )
+
+
 @router.post("/detect-face", response_model=FaceDetectionResponse)
-async def detect_face(image: UploadFile = File(...)):
+async def detect_face(
+    image: UploadFile = File(...),
+    face_hint: str = Form(None),  # Optional: JSON {x, y, width, height} face box
+    user_id: str = Form(None),  # Optional: archive the aligned crop under this ID
+    screen_duplicates: bool = Form(False),  # Optional: check the gallery first
+):
     """
-    Detect faces in uploaded image
+    Detect faces in uploaded image. With screen_duplicates, the embedding is
+    compared against every gallery template as in /generate-embedding.
     """
+    ticket = qos_controller.begin()
     try:
         if not image.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="File must be an image")
 
+        hint = _parse_face_hint(face_hint)
+
         image_data = await image.read()
-        nparr = np.frombuffer(image_data, np.uint8)
-        cv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        cv_image = await inference_pipeline.decode_image(image_data)
 
         if cv_image is None:
             raise HTTPException(status_code=400, detail="Invalid image format")
 
-        success, confidence, bounding_box, message = face_detector.detect_faces(cv_image)
-        faces_detected = face_detector.get_face_count(cv_image)
-
-        embedding = None
-        if success:
-            emb_success, emb_array, emb_confidence, emb_message = (
-                face_recognizer.generate_embedding(cv_image)
-            )
-            if emb_success and emb_array is not None:
-                embedding = emb_array.tolist()
-                logger.info(f"✅ Real embedding generated: {len(embedding)} dimensions")
-            else:
-                logger.warning(f"⚠️ Embedding generation failed: {emb_message}")
-                embedding = np.random.rand(512).tolist()  # Fallback to mock
-
-        logger.info(f"Faces detected: {faces_detected}")
-        logger.info(f"Success: {success}")
-
-        return FaceDetectionResponse(
-            success=success,
-            embedding=embedding,
-            confidence=confidence,
-            message=message,
-            faces_detected=faces_detected,
-            bounding_box=bounding_box,
+        return await _detect_face_response(
+            cv_image, ticket, hint, user_id, screen_duplicates
         )
 
     except HTTPException:
@@ -107,39 +381,80 @@ async def detect_face(image: UploadFile = File(...)):
             message=f"Face detection failed: {str(e)}",
             faces_detected=0,
             bounding_box=None,
+            qos_tier=ticket.tier.name,
         )
+    finally:
+        qos_controller.end(ticket)
 
 
-@router.post("/generate-embedding", response_model=FaceEmbeddingResponse)
-async def generate_embedding(image: UploadFile = File(...)):
+@router.post("/detect-faces-group", response_model=GroupDetectionResponse)
+async def detect_faces_group(image: UploadFile = File(...)):
     """
-    Generate face embedding from uploaded image
+    Detect every face in a high-resolution group image (e.g. a lecture hall)
+    using the full-range model on overlapping native-resolution tiles.
+    Boxes are in original image pixels.
     """
     try:
         if not image.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="File must be an image")
 
         image_data = await image.read()
-        nparr = np.frombuffer(image_data, np.uint8)
-        cv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        cv_image = await inference_pipeline.decode_image(image_data)
 
         if cv_image is None:
             raise HTTPException(status_code=400, detail="Invalid image format")
 
-        success, embedding_array, confidence, message = (
-            face_recognizer.generate_embedding(cv_image)
+        success, faces, tiles, message = await inference_pipeline.detect.run(
+            group_detector.detect_faces, cv_image
         )
 
-        if not success or embedding_array is None:
-            return FaceEmbeddingResponse(success=False, message=message)
+        return GroupDetectionResponse(
+            success=success,
+            faces=faces,
+            faces_detected=len(faces),
+            tiles=tiles,
+            message=message,
+        )
 
-        embedding = embedding_array.tolist()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Group face detection error: {str(e)}")
+        return GroupDetectionResponse(
+            success=False,
+            faces_detected=0,
+            tiles=0,
+            message=f"Group face detection failed: {str(e)}",
+        )
 
-        return FaceEmbeddingResponse(
-            success=True,
-            embedding=embedding,
-            confidence=confidence,
-            message="Face embedding generated successfully",
+
+@router.post("/generate-embedding", response_model=FaceEmbeddingResponse)
+async def generate_embedding(
+    image: UploadFile = File(...),
+    user_id: str = Form(None),  # Optional: archive the aligned crop under this ID
+    face_hint: str = Form(None),  # Optional: JSON {x, y, width, height} face box
+    screen_duplicates: bool = Form(False),  # Optional: check the gallery first
+):
+    """
+    Generate face embedding from uploaded image. With screen_duplicates, the
+    new template is compared against every gallery template and near
+    duplicates registered under other IDs are returned.
+    """
+    ticket = qos_controller.begin()
+    try:
+        if not image.content_type.startswith("image/"):
+            raise HTTPException(status_code=400, detail="File must be an image")
+
+        hint = _parse_face_hint(face_hint)
+
+        image_data = await image.read()
+        cv_image = await inference_pipeline.decode_image(image_data)
+
+        if cv_image is None:
+            raise HTTPException(status_code=400, detail="Invalid image format")
+
+        return await _generate_embedding_response(
+            cv_image, ticket, user_id, hint, screen_duplicates
         )
 
     except HTTPException:
@@ -147,8 +462,12 @@ async def generate_embedding(image: UploadFile = File(...)):
     except Exception as e:
         logger.error(f"Embedding generation error: {str(e)}")
         return FaceEmbeddingResponse(
-            success=False, message=f"Embedding generation failed: {str(e)}"
+            success=False,
+            message=f"Embedding generation failed: {str(e)}",
+            qos_tier=ticket.tier.name,
         )
+    finally:
+        qos_controller.end(ticket)
 
 
 @router.post("/compare-faces", response_model=FaceComparisonResponse)
@@ -197,25 +516,41 @@ async def compare_faces(request: FaceComparisonRequest):
 # =========================================================
 @router.post("/verify-face", response_model=FaceComparisonResponse)
 async def verify_face(
-    image: UploadFile = File(...),
+    image: List[UploadFile] = File(...),  # One frame, or a burst of frames
     student_id: str = Form(None),         # Optional: ID for logging
-    stored_embedding: str = Form(None)    # ✅ REQUIRED: JSON String from Node.js
+    stored_embedding: str = Form(None),   # ✅ REQUIRED: JSON String from Node.js
+    face_hint: str = Form(None),          # Optional: JSON {x, y, width, height}
 ):
     """
     Verify face in uploaded image against specific stored embedding.
     Ensures the person on camera IS the registered user.
+
+    Several "image" parts may be sent as a burst; frames are tried sharpest
+    first and verification stops as soon as the outcome is settled.
+    An optional face_hint box restricts detection to a padded crop around it.
     """
+    ticket = qos_controller.begin()
     try:
-        # 1. Validate Image
-        if not image.content_type.startswith("image/"):
-            raise HTTPException(status_code=400, detail="File must be an image")
+        hint = _parse_face_hint(face_hint)
 
-        image_data = await image.read()
-        nparr = np.frombuffer(image_data, np.uint8)
-        cv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # 1. Validate Image(s)
+        if len(image) > settings.BURST_MAX_FRAMES:
+            logger.warning(
+                f"Burst of {len(image)} frames truncated to {settings.BURST_MAX_FRAMES}"
+            )
 
-        if cv_image is None:
-            raise HTTPException(status_code=400, detail="Invalid image format")
+        cv_images = []
+        for frame in image[: settings.BURST_MAX_FRAMES]:
+            if not frame.content_type.startswith("image/"):
+                raise HTTPException(status_code=400, detail="File must be an image")
+
+            image_data = await frame.read()
+            cv_image = await inference_pipeline.decode_image(image_data)
+
+            if cv_image is None:
+                raise HTTPException(status_code=400, detail="Invalid image format")
+
+            cv_images.append(cv_image)
 
         # 2. Process Stored Embedding (The "Lock")
         target_embedding = None
@@ -233,38 +568,9 @@ async def verify_face(
             except Exception as e:
                 logger.error(f"Failed to parse stored_embedding JSON: {e}")
 
-        # 3. Security Check: If no valid embedding, FAIL immediately.
-        # This prevents "bypass" by sending no data.
-        if target_embedding is None:
-            logger.error(f"❌ Security Block: No valid stored face found for comparison. ID: {student_id}")
-            return FaceComparisonResponse(
-                success=False,
-                similarity=0.0,
-                is_match=False,
-                confidence=0.0,
-                message="Security Error: No valid registered face found for this user."
-            )
-
-        # 4. Compare Live Face vs Stored Face
-        success, similarity, is_match, message = face_recognizer.verify_face(
-            cv_image, target_embedding
-        )
-
-        if not success:
-            return FaceComparisonResponse(
-                success=False,
-                similarity=0.0,
-                is_match=False,
-                confidence=0.0,
-                message=message,
-            )
-
-        return FaceComparisonResponse(
-            success=True,
-            similarity=float(similarity),
-            is_match=is_match,
-            confidence=float(similarity),
-            message=message,
+        # 3. Security Check + 4. Compare Live Face(s) vs Stored Face
+        return await _verify_faces_response(
+            cv_images, target_embedding, student_id, ticket, hint
         )
 
     except HTTPException:
@@ -277,7 +583,10 @@ async def verify_face(
             is_match=False,
             confidence=0.0,
             message=f"Face verification failed: {str(e)}",
+            qos_tier=ticket.tier.name,
         )
+    finally:
+        qos_controller.end(ticket)
 
 
 @router.post("/verify-face-json", response_model=FaceComparisonResponse)
@@ -285,6 +594,7 @@ async def verify_face_json(request: Request):
     """
     Verify face against stored embedding using JSON payload (Alternative endpoint).
     """
+    ticket = qos_controller.begin()
     try:
         data = await request.json()
 
@@ -310,14 +620,15 @@ async def verify_face_json(request: Request):
 
         stored_emb_array = np.array(stored_emb_list, dtype=np.float32)
 
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        cv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        cv_image = await inference_pipeline.decode_image(image_bytes)
 
         if cv_image is None:
             raise HTTPException(status_code=400, detail="Invalid image format")
 
-        success, similarity, is_match, message = face_recognizer.verify_face(
-            cv_image, stored_emb_array
+        success, similarity, is_match, message, _, _ = (
+            await inference_pipeline.verify_face_burst(
+                [cv_image], stored_emb_array, ticket.tier
+            )
         )
 
         if not success:
@@ -327,6 +638,7 @@ async def verify_face_json(request: Request):
                 is_match=False,
                 confidence=0.0,
                 message=message,
+                qos_tier=ticket.tier.name,
             )
 
         return FaceComparisonResponse(
@@ -335,6 +647,7 @@ async def verify_face_json(request: Request):
             is_match=is_match,
             confidence=similarity,
             message=message,
+            qos_tier=ticket.tier.name,
         )
 
     except HTTPException:
@@ -347,4 +660,248 @@ async def verify_face_json(request: Request):
             is_match=False,
             confidence=0.0,
             message=f"Face verification failed: {str(e)}",
-        )
\ No newline at end of file
+            qos_tier=ticket.tier.name,
+        )
+    finally:
+        qos_controller.end(ticket)
+
+
+# =========================================================
+# LOCAL INGEST (trusted co-located callers, no image upload)
+# =========================================================
+def _require_local_caller(request: Request):
+    if not settings.LOCAL_INGEST_ENABLED:
+        raise HTTPException(status_code=404, detail="Local ingest is disabled")
+
+    client_host = request.client.host if request.client else None
+    if client_host not in settings.LOCAL_INGEST_TRUSTED_HOSTS:
+        raise HTTPException(status_code=403, detail="Caller is not trusted for local ingest")
+
+
+async def _load_local_image(ref: LocalImageRef) -> np.ndarray:
+    """Memory-map and decode the referenced file or shared-memory segment"""
+    try:
+        path = resolve_local_image(
+            ref.image_path, ref.shm_name, settings.LOCAL_INGEST_DIRS
+        )
+        cv_image = await inference_pipeline.decode_file(path)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except (ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if cv_image is None:
+        raise HTTPException(status_code=400, detail="Invalid image format")
+
+    return cv_image
+
+
+@router.post("/local/detect-face", response_model=FaceDetectionResponse)
+async def detect_face_local(body: LocalImageRequest, request: Request):
+    """
+    Detect faces in an image referenced by local path or shared-memory name
+    """
+    _require_local_caller(request)
+    ticket = qos_controller.begin()
+    try:
+        hint = _face_hint_dict(body.face_hint)
+        cv_image = await _load_local_image(body)
+        return await _detect_face_response(
+            cv_image, ticket, hint, body.user_id, body.screen_duplicates
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Face detection (local) error: {str(e)}")
+        return FaceDetectionResponse(
+            success=False,
+            embedding=None,
+            confidence=None,
+            message=f"Face detection failed: {str(e)}",
+            faces_detected=0,
+            bounding_box=None,
+            qos_tier=ticket.tier.name,
+        )
+    finally:
+        qos_controller.end(ticket)
+
+
+@router.post("/local/generate-embedding", response_model=FaceEmbeddingResponse)
+async def generate_embedding_local(body: LocalImageRequest, request: Request):
+    """
+    Generate face embedding from an image referenced by local path or
+    shared-memory name
+    """
+    _require_local_caller(request)
+    ticket = qos_controller.begin()
+    try:
+        hint = _face_hint_dict(body.face_hint)
+        cv_image = await _load_local_image(body)
+        return await _generate_embedding_response(
+            cv_image, ticket, body.user_id, hint, body.screen_duplicates
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Embedding generation (local) error: {str(e)}")
+        return FaceEmbeddingResponse(
+            success=False,
+            message=f"Embedding generation failed: {str(e)}",
+            qos_tier=ticket.tier.name,
+        )
+    finally:
+        qos_controller.end(ticket)
+
+
+@router.post("/local/verify-face", response_model=FaceComparisonResponse)
+async def verify_face_local(body: LocalVerifyRequest, request: Request):
+    """
+    Verify one or a burst of locally referenced images against a stored
+    embedding
+    """
+    _require_local_caller(request)
+    ticket = qos_controller.begin()
+    try:
+        if not body.images:
+            raise HTTPException(status_code=400, detail="No images provided")
+
+        cv_images = await asyncio.gather(
+            *(_load_local_image(ref) for ref in body.images[: settings.BURST_MAX_FRAMES])
+        )
+
+        target_embedding = None
+        if len(body.stored_embedding) == 512:
+            target_embedding = np.array(body.stored_embedding, dtype=np.float32)
+        else:
+            logger.warning(f"Invalid embedding length for student {body.student_id}")
+
+        return await _verify_faces_response(
+            list(cv_images),
+            target_embedding,
+            body.student_id,
+            ticket,
+            _face_hint_dict(body.face_hint),
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Face verification (local) error: {str(e)}")
+        return FaceComparisonResponse(
+            success=False,
+            similarity=0.0,
+            is_match=False,
+            confidence=0.0,
+            message=f"Face verification failed: {str(e)}",
+            qos_tier=ticket.tier.name,
+        )
+    finally:
+        qos_controller.end(ticket)
+
+
+# =========================================================
+# EMBEDDING GALLERY (sharded across local worker processes)
+# =========================================================
+def _require_gallery_caller(request: Request):
+    # The gallery is a 1:N identification index over every registered face,
+    # so only the trusted backend may read or change it
+    client_host = request.client.host if request.client else None
+    if client_host not in settings.GALLERY_TRUSTED_HOSTS:
+        raise HTTPException(status_code=403, detail="Caller is not trusted for gallery access")
+
+
+# Gallery calls block on shard IPC (and the first one spawns the workers), so
+# every one of them runs in the threadpool rather than on the event loop
+async def _gallery_info_response(message: str) -> GalleryInfoResponse:
+    info = await run_in_threadpool(gallery.get_gallery_info)
+    return GalleryInfoResponse(
+        success=True,
+        templates=info["templates"],
+        num_shards=info["num_shards"],
+        shard_sizes=info["shard_sizes"],
+        message=message,
+    )
+
+
+@router.get("/gallery", response_model=GalleryInfoResponse)
+async def get_gallery_info(request: Request):
+    """Get template count and shard sizes of the embedding gallery"""
+    _require_gallery_caller(request)
+    return await _gallery_info_response("Gallery info")
+
+
+@router.post("/gallery/templates", response_model=GalleryInfoResponse)
+async def upsert_gallery_templates(body: GalleryUpsertRequest, request: Request):
+    """
+    Add or replace registered templates in the embedding gallery
+    """
+    _require_gallery_caller(request)
+    if not body.templates:
+        raise HTTPException(status_code=400, detail="No templates provided")
+
+    try:
+        template_ids = [template.template_id for template in body.templates]
+        embeddings = np.array(
+            [template.embedding for template in body.templates], dtype=np.float32
+        )
+        await run_in_threadpool(gallery.upsert, template_ids, embeddings)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await _gallery_info_response(f"{len(template_ids)} templates stored")
+
+
+@router.delete("/gallery/templates/{template_id}", response_model=GalleryInfoResponse)
+async def remove_gallery_template(template_id: str, request: Request):
+    """
+    Remove a registered template from the embedding gallery
+    """
+    _require_gallery_caller(request)
+    if not await run_in_threadpool(gallery.remove, template_id):
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    return await _gallery_info_response(f"Template {template_id} removed")
+
+
+@router.post("/gallery/search", response_model=GallerySearchResponse)
+async def search_gallery(body: GallerySearchRequest, request: Request):
+    """
+    Find the registered templates most similar to an embedding
+    """
+    _require_gallery_caller(request)
+    try:
+        matches = await run_in_threadpool(
+            gallery.search,
+            np.array(body.embedding, dtype=np.float32),
+            body.top_k,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return GallerySearchResponse(
+        success=True,
+        matches=[
+            GalleryMatch(template_id=template_id, similarity=similarity)
+            for template_id, similarity in matches
+        ],
+        message=f"{len(matches)} matches found",
+    )
+
+
+@router.put("/gallery/shards", response_model=GalleryInfoResponse)
+async def resize_gallery(body: GalleryShardsRequest, request: Request):
+    """
+    Add or remove shard workers and rebalance templates across them
+    """
+    _require_gallery_caller(request)
+    if not 1 <= body.num_shards <= settings.GALLERY_MAX_SHARDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"num_shards must be between 1 and {settings.GALLERY_MAX_SHARDS}",
+        )
+
+    await run_in_threadpool(gallery.resize, body.num_shards)
+
+    return await _gallery_info_response(f"Gallery rebalanced over {body.num_shards} shards")
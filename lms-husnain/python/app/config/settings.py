@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic_settings import BaseSettings
 
 
@@ -13,6 +15,62 @@ class Settings(BaseSettings):
     MIN_DETECTION_CONFIDENCE: float = 0.5
     MIN_TRACKING_CONFIDENCE: float = 0.5
     FACE_CONFIDENCE_THRESHOLD: float = 0.5
+    DETECTION_SIZE: int = 640  # InsightFace detector input (square)
+    RECOGNITION_MODEL: str = "buffalo_l"  # InsightFace model pack
+
+    # Burst Verification
+    BURST_MAX_FRAMES: int = 5
+    BURST_MIN_FRAMES_FOR_REJECT: int = 2
+    BURST_REJECT_SIMILARITY: float = 0.2
+
+    # Embedding Gallery
+    GALLERY_SHARDS: int = 2
+    GALLERY_SHARD_CAPACITY: int = 4096
+    GALLERY_MAX_SHARDS: int = 16
+    GALLERY_TRUSTED_HOSTS: List[str] = ["127.0.0.1", "::1"]  # e.g. the Node backend
+    DUPLICATE_SIMILARITY_THRESHOLD: float = 0.5  # Same cutoff as verification
+    DUPLICATE_TOP_K: int = 5
+
+    # Load-adaptive Quality of Service
+    QOS_ENABLED: bool = True
+    QOS_QUEUE_HIGH: int = 4
+    QOS_QUEUE_LOW: int = 1
+    QOS_LATENCY_HIGH_MS: float = 1500.0
+    QOS_LATENCY_LOW_MS: float = 500.0
+    QOS_LATENCY_SMOOTHING: float = 0.2
+    QOS_MIN_DWELL_SECONDS: float = 3.0
+    QOS_DEGRADED_IMAGE_SIZES: List[int] = [768, 512]
+    QOS_DEGRADED_DET_SIZES: List[int] = [480, 320]
+
+    # Enrollment Crop Archive (aligned crops kept for offline re-embedding)
+    CROP_ARCHIVE_ENABLED: bool = True
+    CROP_ARCHIVE_PATH: str = "data/face_crops.sqlite3"
+
+    # Local Ingest (trusted co-located callers pass a file path or
+    # shared-memory segment name instead of the image bytes)
+    LOCAL_INGEST_ENABLED: bool = False
+    LOCAL_INGEST_DIRS: List[str] = []
+    LOCAL_INGEST_TRUSTED_HOSTS: List[str] = ["127.0.0.1", "::1"]
+
+    # Stage-parallel Inference Pipeline (worker threads per stage; the
+    # detection and recognition ONNX sessions split the cores in proportion
+    # to the detect and embed worker counts)
+    PIPELINE_DECODE_WORKERS: int = 2
+    PIPELINE_DETECT_WORKERS: int = 2
+    PIPELINE_EMBED_WORKERS: int = 2
+    PIPELINE_QUEUE_SIZE: int = 16
+
+    # Client ROI Hints (detect inside a padded crop around a client-supplied
+    # face box before falling back to the full frame)
+    ROI_HINT_PADDING: float = 0.5  # Fraction of the box size added on each side
+    ROI_HINT_DET_SIZE: int = 320  # InsightFace detector input for the crop
+
+    # Group Detection (full-range MediaPipe on overlapping native-resolution
+    # tiles, merged with non-maximum suppression)
+    GROUP_TILE_SIZE: int = 640
+    GROUP_TILE_OVERLAP: float = 0.2  # Fraction of the tile shared with neighbours
+    GROUP_NMS_OVERLAP: float = 0.5  # Intersection over the smaller box
+    GROUP_DETECT_WORKERS: int = 4
 
     # Image Processing
     MAX_IMAGE_SIZE: int = 1024
@@ -0,0 +1,186 @@
+"""
+Offline re-embedding of every archived enrollment crop.
+
+Reads the aligned crops kept by CropArchive, embeds them in batches with the
+chosen recognition model across worker processes, and writes one JSON line
+per user ({"userId", "faceEmbedding", "model"}) for the Node backend to
+import. Progress is checkpointed after every window of batches, so rerunning
+the same command resumes where it stopped.
+
+Usage (from the python/ directory):
+    python -m app.jobs.reembed --output data/embeddings.jsonl --model buffalo_l
+"""
+
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import List, Tuple
+
+import onnxruntime
+from insightface import model_zoo
+from insightface.model_zoo.arcface_onnx import ArcFaceONNX
+from insightface.utils.storage import ensure_available
+
+from ..config.settings import settings
+from ..services.crop_archive import CropArchive, decode_crop
+from ..services.face_recognizer import embed_aligned_crops
+
+logger = logging.getLogger(__name__)
+
+# Recognition model of the current worker process
+_recognition_model = None
+
+
+def find_recognition_model(model_name: str) -> str:
+    """Return the path of the recognition ONNX file in an InsightFace model pack"""
+    model_dir = ensure_available("models", model_name, root="~/.insightface")
+    for onnx_file in sorted(glob.glob(os.path.join(model_dir, "*.onnx"))):
+        model = model_zoo.get_model(onnx_file)
+        if model is not None and model.taskname == "recognition":
+            return onnx_file
+    raise FileNotFoundError(f"No recognition model found in {model_name}")
+
+
+def _init_worker(model_path: str, threads: int):
+    global _recognition_model
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    session = onnxruntime.InferenceSession(
+        model_path, options, providers=["CPUExecutionProvider"]
+    )
+    _recognition_model = ArcFaceONNX(model_file=model_path, session=session)
+
+
+def _embed_batch(batch: List[Tuple[str, bytes]]) -> List[Tuple[str, List[float]]]:
+    crops = [decode_crop(data) for _, data in batch]
+    embeddings = embed_aligned_crops(_recognition_model, crops)
+    return [
+        (user_id, embedding.tolist())
+        for (user_id, _), embedding in zip(batch, embeddings)
+    ]
+
+
+def _load_checkpoint(checkpoint_path: Path, output_path: Path, model_name: str) -> dict:
+    fresh = {"model": model_name, "last_user_id": None, "processed": 0, "output_bytes": 0}
+
+    if not checkpoint_path.exists() or not output_path.exists():
+        return fresh
+
+    state = json.loads(checkpoint_path.read_text())
+    if state.get("model") != model_name:
+        raise SystemExit(
+            f"Checkpoint was written for model {state.get('model')!r}; "
+            f"rerun with --restart to re-embed with {model_name!r}"
+        )
+    return state
+
+
+def _save_checkpoint(checkpoint_path: Path, state: dict):
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    tmp_path = checkpoint_path.with_suffix(checkpoint_path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(state))
+    os.replace(tmp_path, checkpoint_path)
+
+
+def run(
+    archive_path: str,
+    output_path: str,
+    model_name: str,
+    workers: int,
+    batch_size: int,
+    restart: bool = False,
+) -> dict:
+    output_path = Path(output_path)
+    checkpoint_path = output_path.with_name(output_path.name + ".checkpoint")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if restart:
+        checkpoint_path.unlink(missing_ok=True)
+    state = _load_checkpoint(checkpoint_path, output_path, model_name)
+
+    archive = CropArchive(archive_path)
+    total = archive.count()
+    logger.info(
+        f"🔁 Re-embedding {total} archived crops with {model_name} "
+        f"({state['processed']} already done)"
+    )
+
+    model_path = find_recognition_model(model_name)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context("spawn")
+    batches = archive.iter_batches(batch_size, after=state["last_user_id"])
+
+    with open(output_path, "r+b" if state["output_bytes"] else "wb") as output:
+        # Drop any lines written after the last checkpoint
+        output.truncate(state["output_bytes"])
+        output.seek(state["output_bytes"])
+
+        with context.Pool(
+            workers, initializer=_init_worker, initargs=(model_path, threads)
+        ) as pool:
+            while True:
+                # A bounded window keeps memory flat for large archives
+                window = list(islice(batches, workers * 2))
+                if not window:
+                    break
+
+                for results in pool.map(_embed_batch, window):
+                    for user_id, embedding in results:
+                        line = {
+                            "userId": user_id,
+                            "faceEmbedding": embedding,
+                            "model": model_name,
+                        }
+                        output.write((json.dumps(line) + "\n").encode())
+                    state["processed"] += len(results)
+
+                output.flush()
+                os.fsync(output.fileno())
+
+                state["last_user_id"] = window[-1][-1][0]
+                state["output_bytes"] = output.tell()
+                _save_checkpoint(checkpoint_path, state)
+
+                logger.info(f"📦 {state['processed']}/{total} crops re-embedded")
+
+    archive.close()
+    logger.info(f"✅ Re-embedding complete: {state['processed']} users -> {output_path}")
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archive", default=settings.CROP_ARCHIVE_PATH)
+    parser.add_argument("--output", default="data/embeddings.jsonl")
+    parser.add_argument("--model", default=settings.RECOGNITION_MODEL)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore any checkpoint and start over"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    run(
+        args.archive,
+        args.output,
+        args.model,
+        max(args.workers, 1),
+        max(args.batch_size, 1),
+        args.restart,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 # Add the app directory to Python path
 sys.path.append(str(Path(__file__).parent))
 
-from .api.routes import router
+from .api.routes import close_services, init_services, router
 from .config.settings import settings
 
 # Configure logging
@@ -45,11 +45,13 @@ async def startup_event():
     logger.info("🚀 Face Detection Service starting up...")
     logger.info(f"📊 Settings: Debug={settings.DEBUG}, Log Level={settings.LOG_LEVEL}")
     logger.info(f"🎯 Face confidence threshold: {settings.FACE_CONFIDENCE_THRESHOLD}")
+    init_services()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("👋 Face Detection Service shutting down...")
+    close_services()
 
 
 if __name__ == "__main__":
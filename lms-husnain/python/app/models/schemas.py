@@ -9,6 +9,11 @@ class HealthResponse(BaseModel):
     version: str
 
 
+class GalleryMatch(BaseModel):
+    template_id: str
+    similarity: float
+
+
 class FaceDetectionResponse(BaseModel):
     success: bool
     embedding: Optional[List[float]] = None
@@ -16,6 +21,26 @@ class FaceDetectionResponse(BaseModel):
     message: str
     faces_detected: int
     bounding_box: Optional[dict] = None
+    qos_tier: Optional[str] = None
+    hint_used: Optional[bool] = None
+    duplicates: Optional[List[GalleryMatch]] = None
+    templates_screened: Optional[int] = None
+
+
+class GroupFace(BaseModel):
+    x: int
+    y: int
+    width: int
+    height: int
+    confidence: float
+
+
+class GroupDetectionResponse(BaseModel):
+    success: bool
+    faces: List[GroupFace] = []
+    faces_detected: int
+    tiles: int
+    message: str
 
 
 class FaceEmbeddingResponse(BaseModel):
@@ -23,6 +48,10 @@ class FaceEmbeddingResponse(BaseModel):
     embedding: Optional[List[float]] = None
     confidence: Optional[float] = None
     message: str
+    qos_tier: Optional[str] = None
+    hint_used: Optional[bool] = None
+    duplicates: Optional[List[GalleryMatch]] = None
+    templates_screened: Optional[int] = None
 
 
 class FaceComparisonRequest(BaseModel):
@@ -30,9 +59,71 @@ class FaceComparisonRequest(BaseModel):
     embedding2: List[float]
 
 
+class FaceHint(BaseModel):
+    """Client-supplied face box in original image pixels"""
+
+    x: float
+    y: float
+    width: float
+    height: float
+
+
+class LocalImageRef(BaseModel):
+    image_path: Optional[str] = None
+    shm_name: Optional[str] = None
+
+
+class LocalImageRequest(LocalImageRef):
+    user_id: Optional[str] = None
+    face_hint: Optional[FaceHint] = None
+    screen_duplicates: bool = False
+
+
+class LocalVerifyRequest(BaseModel):
+    images: List[LocalImageRef]
+    stored_embedding: List[float]
+    student_id: Optional[str] = None
+    face_hint: Optional[FaceHint] = None
+
+
 class FaceComparisonResponse(BaseModel):
     success: bool
     similarity: float
     is_match: bool
     confidence: float
     message: str
+    frames_used: Optional[int] = None
+    qos_tier: Optional[str] = None
+    hint_used: Optional[bool] = None
+
+
+class GalleryTemplate(BaseModel):
+    template_id: str
+    embedding: List[float]
+
+
+class GalleryUpsertRequest(BaseModel):
+    templates: List[GalleryTemplate]
+
+
+class GallerySearchRequest(BaseModel):
+    embedding: List[float]
+    top_k: int = 5
+
+
+class GallerySearchResponse(BaseModel):
+    success: bool
+    matches: List[GalleryMatch]
+    message: str
+
+
+class GalleryShardsRequest(BaseModel):
+    num_shards: int
+
+
+class GalleryInfoResponse(BaseModel):
+    success: bool
+    templates: int
+    num_shards: int
+    shard_sizes: List[int]
+    message: str
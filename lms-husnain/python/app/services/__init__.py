@@ -1,4 +1,18 @@
+from .crop_archive import CropArchive
 from .face_detector import FaceDetector
 from .face_recognizer import FaceRecognizer
+from .gallery import ShardedGallery
+from .group_detector import GroupFaceDetector
+from .pipeline import InferencePipeline
+from .qos import QoSController, QoSTier
 
-__all__ = ["FaceDetector", "FaceRecognizer"]
\ No newline at end of file
+__all__ = [
+    "CropArchive",
+    "FaceDetector",
+    "FaceRecognizer",
+    "GroupFaceDetector",
+    "InferencePipeline",
+    "QoSController",
+    "QoSTier",
+    "ShardedGallery",
+]
\ No newline at end of file
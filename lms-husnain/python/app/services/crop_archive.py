@@ -0,0 +1,92 @@
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CropArchive:
+    """
+    Single-file archive of aligned 112x112 enrollment crops, keyed by user id.
+
+    Crops are stored PNG-encoded (lossless) in a SQLite table so the whole
+    population can be re-embedded when the recognition model changes.
+    """
+
+    def __init__(self, path: str = settings.CROP_ARCHIVE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS crops ("
+                " user_id TEXT PRIMARY KEY,"
+                " crop BLOB NOT NULL,"
+                " updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def put(self, user_id: str, crop: np.ndarray):
+        """Store (or replace) the aligned crop of a user"""
+        ok, encoded = cv2.imencode(".png", crop)
+        if not ok:
+            raise ValueError("Failed to encode face crop")
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO crops (user_id, crop) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET "
+                "crop = excluded.crop, updated_at = CURRENT_TIMESTAMP",
+                (user_id, encoded.tobytes()),
+            )
+            conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM crops").fetchone()[0]
+
+    def iter_batches(
+        self, batch_size: int, after: Optional[str] = None
+    ) -> Iterator[List[Tuple[str, bytes]]]:
+        """Yield (user_id, encoded crop) batches ordered by user id"""
+        while True:
+            with self._lock:
+                rows = (
+                    self._connect()
+                    .execute(
+                        "SELECT user_id, crop FROM crops WHERE user_id > ? "
+                        "ORDER BY user_id LIMIT ?",
+                        (after or "", batch_size),
+                    )
+                    .fetchall()
+                )
+
+            if not rows:
+                return
+
+            yield rows
+            after = rows[-1][0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def decode_crop(data: bytes) -> np.ndarray:
+    """Decode a crop stored by CropArchive.put"""
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
@@ -6,13 +6,15 @@ import mediapipe as mp
 import numpy as np
 
 from ..config.settings import settings
-from ..utils.image_utils import resize_image, validate_image
+from ..utils.image_utils import padded_roi, resize_image, scale_box, validate_image
+from .qos import QoSTier
 
 logger = logging.getLogger(__name__)
 
 
 class FaceDetector:
-    def __init__(self):
+    def __init__(self, model_selection: int = 0):
+        self.model_selection = model_selection  # 0 for short-range, 1 for full-range
         self.face_detection = None
         self._initialize_detector()
 
@@ -20,7 +22,7 @@ class FaceDetector:
         """Initialize MediaPipe face detector"""
         try:
             self.face_detection = mp.solutions.face_detection.FaceDetection(
-                model_selection=0,  # 0 for short-range, 1 for full-range
+                model_selection=self.model_selection,
                 min_detection_confidence=settings.MIN_DETECTION_CONFIDENCE,
             )
             logger.info("✅ MediaPipe face detector initialized successfully")
@@ -29,10 +31,11 @@ class FaceDetector:
             self.face_detection = None
 
     def detect_faces(
-        self, image: np.ndarray
+        self, image: np.ndarray, tier: Optional[QoSTier] = None
     ) -> Tuple[bool, Optional[float], Optional[dict], str]:
         """
-        Detect faces in image using MediaPipe
+        Detect faces in image using MediaPipe, at the QoS tier's image size
+        when one is given
 
         Returns:
             - success: bool
@@ -45,7 +48,8 @@ class FaceDetector:
                 return False, None, None, "Invalid image provided"
 
             # Resize if too large
-            processed_image = resize_image(image, settings.MAX_IMAGE_SIZE)
+            max_image_size = tier.max_image_size if tier else settings.MAX_IMAGE_SIZE
+            processed_image = resize_image(image, max_image_size)
 
             # Convert BGR to RGB for MediaPipe
             rgb_image = cv2.cvtColor(processed_image, cv2.COLOR_BGR2RGB)
@@ -86,7 +90,79 @@ class FaceDetector:
             logger.error(f"❌ Face detection error: {str(e)}")
             return False, None, None, f"Face detection failed: {str(e)}"
 
-    def get_face_count(self, image: np.ndarray) -> int:
+    def detect_faces_in_roi(
+        self, image: np.ndarray, hint: dict, tier: Optional[QoSTier] = None
+    ) -> Tuple[bool, Optional[float], Optional[dict], str, int]:
+        """
+        Detect faces only inside a padded crop around a client-supplied
+        {x, y, width, height} hint (in original image pixels)
+
+        Returns:
+            - success, confidence, bounding_box, message (as detect_faces,
+              with the box in the same resized coordinates)
+            - face_count: int (faces found inside the crop)
+        """
+        try:
+            if not validate_image(image):
+                return False, None, None, "Invalid image provided", 0
+
+            if self.face_detection is None:
+                return False, None, None, "Face detector not available", 0
+
+            max_image_size = tier.max_image_size if tier else settings.MAX_IMAGE_SIZE
+            processed_image = resize_image(image, max_image_size)
+            scale = processed_image.shape[1] / image.shape[1]
+
+            roi = padded_roi(
+                processed_image.shape,
+                scale_box(hint, scale),
+                settings.ROI_HINT_PADDING,
+            )
+            if roi is None:
+                return False, None, None, "Face hint is outside the image", 0
+
+            x0, y0, x1, y1 = roi
+            rgb_crop = cv2.cvtColor(processed_image[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)
+
+            results = self.face_detection.process(rgb_crop)
+
+            if not results.detections:
+                return False, None, None, "No faces detected inside the hint", 0
+
+            best_detection = max(
+                results.detections, key=lambda detection: detection.score[0]
+            )
+            confidence = float(best_detection.score[0])
+
+            # Map the box from crop-relative back to resized-image coordinates
+            bbox = best_detection.location_data.relative_bounding_box
+            crop_w, crop_h = x1 - x0, y1 - y0
+
+            bounding_box = {
+                "x": x0 + int(bbox.xmin * crop_w),
+                "y": y0 + int(bbox.ymin * crop_h),
+                "width": int(bbox.width * crop_w),
+                "height": int(bbox.height * crop_h),
+            }
+
+            logger.info(
+                f"✅ Face detected inside hint: confidence={confidence:.3f}, "
+                f"bbox={bounding_box}"
+            )
+
+            return (
+                True,
+                confidence,
+                bounding_box,
+                "Face detected successfully",
+                len(results.detections),
+            )
+
+        except Exception as e:
+            logger.error(f"❌ Hinted face detection error: {str(e)}")
+            return False, None, None, f"Face detection failed: {str(e)}", 0
+
+    def get_face_count(self, image: np.ndarray, tier: Optional[QoSTier] = None) -> int:
         """
         Count number of faces in image
         """
@@ -95,7 +171,8 @@ class FaceDetector:
                 return 0
 
             # Resize if too large
-            processed_image = resize_image(image, settings.MAX_IMAGE_SIZE)
+            max_image_size = tier.max_image_size if tier else settings.MAX_IMAGE_SIZE
+            processed_image = resize_image(image, max_image_size)
 
             # Convert BGR to RGB for MediaPipe
             rgb_image = cv2.cvtColor(processed_image, cv2.COLOR_BGR2RGB)
@@ -119,6 +196,7 @@ class FaceDetector:
         """Get information about the face detection system"""
         return {
             "model": "MediaPipe",
+            "model_selection": self.model_selection,
             "available": self.face_detection is not None,
             "min_confidence": settings.MIN_DETECTION_CONFIDENCE,
         }
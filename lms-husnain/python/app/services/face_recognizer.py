@@ -1,16 +1,52 @@
 import logging
-from typing import Optional, Tuple
+import os
+from typing import List, Optional, Tuple
 
 import insightface
 import numpy as np
+import onnxruntime
+from insightface.app.common import Face
+from insightface.utils import face_align
 from sklearn.metrics.pairwise import cosine_similarity
 
 from ..config.settings import settings
-from ..utils.image_utils import convert_to_rgb, resize_image, validate_image
+from ..utils.image_utils import (
+    convert_to_rgb,
+    padded_roi,
+    resize_image,
+    scale_box,
+    validate_image,
+)
+from .qos import QoSTier
 
 logger = logging.getLogger(__name__)
 
 
+def embed_aligned_crops(recognition_model, crops: List[np.ndarray]) -> np.ndarray:
+    """
+    Embed a batch of aligned face crops in one forward pass and L2-normalize
+    each row (important for consistent comparisons)
+    """
+    if not crops:
+        return np.empty((0, 0), dtype=np.float32)
+
+    embeddings = recognition_model.get_feat(crops)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def stage_session_threads(workers: int) -> int:
+    """
+    Intra-op threads for the ONNX session of a pipeline stage with the given
+    number of workers. The detect and embed stages run at the same time and
+    each session's pool is shared by its stage's workers, so the cores are
+    split between the two sessions in proportion to their worker counts.
+    """
+    total_workers = max(settings.PIPELINE_DETECT_WORKERS, 1) + max(
+        settings.PIPELINE_EMBED_WORKERS, 1
+    )
+    return max(1, (os.cpu_count() or 1) * max(workers, 1) // total_workers)
+
+
 class FaceRecognizer:
     def __init__(self):
         self.app = None
@@ -20,11 +56,22 @@ class FaceRecognizer:
     def _initialize_model(self):
         """Initialize InsightFace model"""
         try:
-            # Initialize InsightFace app
+            # Initialize InsightFace app (only detection and recognition are
+            # used, so the landmark and gender/age models are not loaded)
             self.app = insightface.app.FaceAnalysis(
-                providers=["CPUExecutionProvider"]  # Use CPU (GPU optional)
+                name=settings.RECOGNITION_MODEL,
+                allowed_modules=["detection", "recognition"],
+                providers=["CPUExecutionProvider"],  # Use CPU (GPU optional)
+            )
+            self.app.prepare(
+                ctx_id=0, det_size=(settings.DETECTION_SIZE, settings.DETECTION_SIZE)
             )
-            self.app.prepare(ctx_id=0, det_size=(640, 640))
+
+            # FaceAnalysis builds its sessions with default options, which
+            # size every intra-op pool to all cores and oversubscribe the CPU
+            # once both stages run. Rebuild them sized to each stage
+            self._size_session("detection", settings.PIPELINE_DETECT_WORKERS)
+            self._size_session("recognition", settings.PIPELINE_EMBED_WORKERS)
 
             logger.info("✅ InsightFace model initialized successfully")
 
@@ -33,75 +80,150 @@ class FaceRecognizer:
             logger.warning("🔄 Falling back to mock embeddings")
             self.app = None
 
-    def generate_embedding(
-        self, image: np.ndarray
-    ) -> Tuple[bool, Optional[np.ndarray], Optional[float], str]:
+    def _size_session(self, taskname: str, workers: int):
+        model = self.app.models[taskname]
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = stage_session_threads(workers)
+        options.inter_op_num_threads = 1
+        model.session = onnxruntime.InferenceSession(
+            model.model_file, options, providers=["CPUExecutionProvider"]
+        )
+        logger.info(
+            f"🧵 {taskname} session: {options.intra_op_num_threads} intra-op threads"
+        )
+
+    def detect_faces(
+        self, rgb_image: np.ndarray, det_size: Optional[int] = None
+    ) -> List[Face]:
         """
-        Generate face embedding from image
-
-        Returns:
-            - success: bool
-            - embedding: Optional[np.ndarray]
-            - confidence: Optional[float]
-            - message: str
+        Detect faces with the InsightFace detector at the given input size
         """
-        try:
-            if not validate_image(image):
-                return False, None, None, "Invalid image provided"
-
-            # Resize if too large
-            processed_image = resize_image(image, settings.MAX_IMAGE_SIZE)
-
-            # Convert to RGB for InsightFace
-            rgb_image = convert_to_rgb(processed_image)
-
-            if self.app is None:
-                # Fallback to mock embedding
-                logger.warning("Using mock embedding - InsightFace not available")
-                mock_embedding = np.random.rand(self.embedding_size).astype(np.float32)
-                return (
-                    True,
-                    mock_embedding,
-                    0.85,
-                    "Mock embedding generated (InsightFace not available)",
-                )
+        det_size = det_size or settings.DETECTION_SIZE
+        bboxes, kpss = self.app.det_model.detect(
+            rgb_image, input_size=(det_size, det_size), max_num=0, metric="default"
+        )
+
+        return [
+            Face(
+                bbox=bboxes[i, 0:4],
+                kps=kpss[i] if kpss is not None else None,
+                det_score=bboxes[i, 4],
+            )
+            for i in range(bboxes.shape[0])
+        ]
 
-            # Detect and analyze faces
-            faces = self.app.get(rgb_image)
+    def align_face(self, rgb_image: np.ndarray, face: Face) -> np.ndarray:
+        """
+        Warp a detected face to the aligned crop the recognition model expects
+        """
+        image_size = self.app.models["recognition"].input_size[0]
+        return face_align.norm_crop(rgb_image, landmark=face.kps, image_size=image_size)
 
-            if not faces:
-                return False, None, None, "No faces detected in image"
+    def prepare_image(
+        self, image: np.ndarray, tier: Optional[QoSTier] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Resize to the tier's image size and convert to RGB for InsightFace
+        """
+        if not validate_image(image):
+            return None
+
+        max_image_size = tier.max_image_size if tier else settings.MAX_IMAGE_SIZE
+        return convert_to_rgb(resize_image(image, max_image_size))
+
+    def mock_embedding(
+        self,
+    ) -> Tuple[bool, Optional[np.ndarray], Optional[float], Optional[np.ndarray], str]:
+        """Fallback result used when InsightFace is not available"""
+        logger.warning("Using mock embedding - InsightFace not available")
+        mock_embedding = np.random.rand(self.embedding_size).astype(np.float32)
+        return (
+            True,
+            mock_embedding,
+            0.85,
+            None,
+            "Mock embedding generated (InsightFace not available)",
+        )
+
+    def detect_best_face(
+        self, rgb_image: np.ndarray, tier: Optional[QoSTier] = None
+    ) -> Optional[Face]:
+        """
+        Detect faces at the tier's detector size and return the largest one
+        """
+        faces = self.detect_faces(rgb_image, tier.det_size if tier else None)
 
-            if len(faces) > 1:
-                logger.warning(
-                    f"Multiple faces detected ({len(faces)}), using the largest one"
-                )
+        if not faces:
+            return None
 
-            # Get the face with highest confidence (largest bounding box area)
-            best_face = max(
-                faces, key=lambda x: (x.bbox[2] - x.bbox[0]) * (x.bbox[3] - x.bbox[1])
+        if len(faces) > 1:
+            logger.warning(
+                f"Multiple faces detected ({len(faces)}), using the largest one"
             )
 
-            # Extract embedding
-            embedding = best_face.embedding
-            confidence = float(best_face.det_score)
+        # Get the face with highest confidence (largest bounding box area)
+        return max(
+            faces, key=lambda x: (x.bbox[2] - x.bbox[0]) * (x.bbox[3] - x.bbox[1])
+        )
 
-            # Validate embedding
-            if embedding is None or len(embedding) == 0:
-                return False, None, None, "Failed to extract face embedding"
+    def detect_face_in_hint(
+        self, rgb_image: np.ndarray, hint: dict, scale: float = 1.0
+    ) -> Optional[Face]:
+        """
+        Detect only inside a padded crop around a client-supplied
+        {x, y, width, height} hint, at the smaller ROI detector size. The
+        hint is multiplied by scale (resized / original image width), and
+        the returned face is in rgb_image coordinates
+        """
+        roi = padded_roi(
+            rgb_image.shape, scale_box(hint, scale), settings.ROI_HINT_PADDING
+        )
+        if roi is None:
+            return None
+
+        x0, y0, x1, y1 = roi
+        det_size = min(settings.ROI_HINT_DET_SIZE, settings.DETECTION_SIZE)
+        faces = self.detect_faces(rgb_image[y0:y1, x0:x1], det_size)
+
+        if not faces:
+            return None
+
+        face = max(
+            faces, key=lambda x: (x.bbox[2] - x.bbox[0]) * (x.bbox[3] - x.bbox[1])
+        )
+
+        # Shift back to full-frame coordinates so alignment uses the full image
+        offset = np.array([x0, y0], dtype=face.bbox.dtype)
+        face.bbox = face.bbox + np.tile(offset, 2)
+        if face.kps is not None:
+            face.kps = face.kps + offset
+
+        return face
+
+    def embed_face(
+        self, rgb_image: np.ndarray, face: Face
+    ) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Align one detected face and extract its normalized embedding
 
-            # Normalize embedding (important for consistent comparisons)
-            embedding = embedding / np.linalg.norm(embedding)
+        Returns:
+            - embedding: Optional[np.ndarray]
+            - crop: np.ndarray (aligned RGB crop)
+        """
+        crop = self.align_face(rgb_image, face)
+        embeddings = embed_aligned_crops(self.app.models["recognition"], [crop])
 
-            logger.info(
-                f"✅ Face embedding generated: size={len(embedding)}, confidence={confidence:.3f}"
-            )
+        if embeddings.size == 0:
+            return None, crop
 
-            return True, embedding, confidence, "Face embedding generated successfully"
+        embedding = embeddings[0]
 
-        except Exception as e:
-            logger.error(f"❌ Embedding generation error: {str(e)}")
-            return False, None, None, f"Embedding generation failed: {str(e)}"
+        logger.info(
+            f"✅ Face embedding generated: size={len(embedding)}, "
+            f"confidence={float(face.det_score):.3f}"
+        )
+
+        return embedding, crop
 
     def compare_embeddings(
         self, embedding1: np.ndarray, embedding2: np.ndarray
@@ -152,39 +274,6 @@ class FaceRecognizer:
             logger.error(f"❌ Embedding comparison error: {str(e)}")
             return False, 0.0, False, f"Comparison failed: {str(e)}"
 
-    def verify_face(
-        self, image: np.ndarray, stored_embedding: np.ndarray
-    ) -> Tuple[bool, Optional[float], Optional[bool], str]:
-        """
-        Verify face in image against stored embedding
-
-        Returns:
-            - success: bool
-            - similarity: Optional[float]
-            - is_match: Optional[bool]
-            - message: str
-        """
-        try:
-            # Generate embedding from new image
-            success, new_embedding, confidence, message = self.generate_embedding(image)
-
-            if not success or new_embedding is None:
-                return False, None, None, message
-
-            # Compare embeddings
-            comp_success, similarity, is_match, comp_message = self.compare_embeddings(
-                new_embedding, stored_embedding
-            )
-
-            if not comp_success:
-                return False, None, None, comp_message
-
-            return True, similarity, is_match, comp_message
-
-        except Exception as e:
-            logger.error(f"❌ Face verification error: {str(e)}")
-            return False, None, None, f"Face verification failed: {str(e)}"
-
     def get_embedding_info(self) -> dict:
         """Get information about the face recognition system"""
         return {
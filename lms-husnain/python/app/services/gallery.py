@@ -0,0 +1,338 @@
+import logging
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.settings import settings
+from ..utils.shard_worker import run_shard_worker
+
+logger = logging.getLogger(__name__)
+
+# Raised on the coordinator's end of the pipe when a shard worker has died
+_WORKER_ERRORS = (EOFError, OSError)
+
+
+class _GalleryShard:
+    """
+    One worker process plus the shared-memory matrix it searches.
+
+    The coordinator owns the matrix and the row ids, so a dead worker can be
+    replaced without losing any templates. Every command carries a request
+    id and replies to abandoned requests are dropped, so a query that failed
+    halfway never leaves a stale answer in the pipe.
+    """
+
+    def __init__(self, context, dim: int, capacity: int):
+        self.dim = dim
+        self.capacity = 0
+        self.ids: List[str] = []
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.matrix: Optional[np.ndarray] = None
+        self._context = context
+        self._last_request_id = 0
+
+        self._start_worker()
+        self.allocate(capacity)
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    def _start_worker(self):
+        self.conn, child_conn = self._context.Pipe()
+        self.process = self._context.Process(
+            target=run_shard_worker, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def _stop_worker(self):
+        try:
+            self.send("stop")
+        except _WORKER_ERRORS:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+    def restart(self):
+        """Replace the worker process and attach it to the current matrix"""
+        self._stop_worker()
+        self._start_worker()
+        if self.shm is not None:
+            self.call("attach", self.shm.name, self.capacity, self.dim)
+
+    def send(self, command: str, *args) -> int:
+        """Send a command to the worker and return its request id"""
+        self._last_request_id += 1
+        self.conn.send((command, self._last_request_id, *args))
+        return self._last_request_id
+
+    def receive(self, request_id: int):
+        """Wait for the reply to request_id, dropping replies to older requests"""
+        while True:
+            reply_id, result = self.conn.recv()
+            if reply_id == request_id:
+                return result
+
+    def call(self, command: str, *args):
+        return self.receive(self.send(command, *args))
+
+    def allocate(self, capacity: int):
+        """Move rows into a new shared-memory matrix of the given capacity"""
+        capacity = max(capacity, 1)
+        shm = shared_memory.SharedMemory(create=True, size=capacity * self.dim * 4)
+        matrix = np.ndarray((capacity, self.dim), dtype=np.float32, buffer=shm.buf)
+
+        if self.matrix is not None:
+            matrix[: self.count] = self.matrix[: self.count]
+
+        try:
+            self._attach(shm.name, capacity)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+
+        self._release()
+        self.shm, self.matrix, self.capacity = shm, matrix, capacity
+
+    def _attach(self, name: str, capacity: int):
+        try:
+            self.call("attach", name, capacity, self.dim)
+        except _WORKER_ERRORS:
+            logger.warning("⚠️ Gallery shard worker died, restarting it")
+            self._stop_worker()
+            self._start_worker()
+            self.call("attach", name, capacity, self.dim)
+
+    def ensure_capacity(self, needed: int):
+        if needed > self.capacity:
+            self.allocate(max(needed, self.capacity * 2))
+
+    def stop(self):
+        self._stop_worker()
+        self._release()
+
+    def _release(self):
+        self.matrix = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class ShardedGallery:
+    """
+    Embedding gallery split across local worker processes.
+
+    Each shard owns a contiguous float32 matrix in shared memory. The
+    coordinator writes rows directly into those matrices and fans every
+    query out to all shards, then merges their top-k results.
+    """
+
+    def __init__(
+        self,
+        num_shards: int = settings.GALLERY_SHARDS,
+        dim: int = 512,
+        shard_capacity: int = settings.GALLERY_SHARD_CAPACITY,
+    ):
+        self.num_shards = max(num_shards, 1)
+        self.dim = dim
+        self.shard_capacity = shard_capacity
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.RLock()
+        self._shards: List[_GalleryShard] = []
+        self._locations: Dict[str, Tuple[int, int]] = {}
+
+    def _ensure_started(self):
+        if not self._shards:
+            self._shards = [
+                _GalleryShard(self._context, self.dim, self.shard_capacity)
+                for _ in range(self.num_shards)
+            ]
+            logger.info(f"✅ Gallery started with {self.num_shards} shard workers")
+
+    def _normalize(self, embeddings: np.ndarray) -> np.ndarray:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.shape[-1] != self.dim:
+            raise ValueError(
+                f"Embedding dimensions mismatch: {embeddings.shape[-1]} vs {self.dim}"
+            )
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def upsert(self, template_ids: List[str], embeddings: np.ndarray) -> int:
+        """Insert or replace templates; new ones go to the least loaded shard"""
+        rows = self._normalize(np.atleast_2d(embeddings))
+        if len(template_ids) != rows.shape[0]:
+            raise ValueError("template_ids and embeddings must have the same length")
+
+        with self._lock:
+            self._ensure_started()
+
+            for template_id, row in zip(template_ids, rows):
+                location = self._locations.get(template_id)
+                if location is not None:
+                    shard_index, row_index = location
+                    self._shards[shard_index].matrix[row_index] = row
+                    continue
+
+                shard_index = min(
+                    range(len(self._shards)), key=lambda i: self._shards[i].count
+                )
+                shard = self._shards[shard_index]
+                shard.ensure_capacity(shard.count + 1)
+                shard.matrix[shard.count] = row
+                self._locations[template_id] = (shard_index, shard.count)
+                shard.ids.append(template_id)
+
+            return len(self._locations)
+
+    def remove(self, template_id: str) -> bool:
+        """Remove a template, filling its row with the shard's last row"""
+        with self._lock:
+            location = self._locations.pop(template_id, None)
+            if location is None:
+                return False
+
+            shard_index, row_index = location
+            shard = self._shards[shard_index]
+            last_index = shard.count - 1
+
+            if row_index != last_index:
+                moved_id = shard.ids[last_index]
+                shard.matrix[row_index] = shard.matrix[last_index]
+                shard.ids[row_index] = moved_id
+                self._locations[moved_id] = (shard_index, row_index)
+
+            shard.ids.pop()
+            return True
+
+    def search(
+        self, embedding: np.ndarray, top_k: int = 5
+    ) -> List[Tuple[str, float]]:
+        """Return the top_k (template_id, similarity) pairs across all shards"""
+        query = self._normalize(embedding).reshape(-1)
+
+        with self._lock:
+            active = [shard for shard in self._shards if shard.count > 0]
+            pending, failed = [], []
+
+            # Fan out first so shards search in parallel, then collect
+            for shard in active:
+                try:
+                    request_id = shard.send("search", query, top_k, shard.count)
+                    pending.append((shard, request_id))
+                except _WORKER_ERRORS:
+                    failed.append(shard)
+
+            results = []
+            for shard, request_id in pending:
+                try:
+                    results.append((shard, shard.receive(request_id)))
+                except _WORKER_ERRORS:
+                    failed.append(shard)
+
+            # Replace dead workers and ask again, so the result stays complete
+            for shard in failed:
+                logger.warning("⚠️ Gallery shard worker died, restarting it")
+                shard.restart()
+                results.append(
+                    (shard, shard.call("search", query, top_k, shard.count))
+                )
+
+            candidates = [
+                (shard.ids[index], float(score))
+                for shard, (indices, scores) in results
+                for index, score in zip(indices, scores)
+            ]
+
+        candidates.sort(key=lambda candidate: candidate[1], reverse=True)
+        return candidates[:top_k]
+
+    def find_duplicates(
+        self,
+        embedding: np.ndarray,
+        exclude_id: Optional[str] = None,
+        threshold: float = settings.DUPLICATE_SIMILARITY_THRESHOLD,
+        top_k: int = settings.DUPLICATE_TOP_K,
+    ) -> List[Tuple[str, float]]:
+        """
+        Screen a new template against the whole gallery: the top_k templates
+        at or above threshold, ignoring exclude_id (the enrolling user's own
+        previous template)
+        """
+        # One extra candidate so excluding the user's own template never
+        # shortens the result
+        candidates = self.search(embedding, top_k + 1)
+        return [
+            (template_id, similarity)
+            for template_id, similarity in candidates
+            if template_id != exclude_id and similarity >= threshold
+        ][:top_k]
+
+    def resize(self, num_shards: int) -> int:
+        """Change the number of shards and rebalance rows evenly across them"""
+        num_shards = max(num_shards, 1)
+
+        with self._lock:
+            if not self._shards:
+                self.num_shards = num_shards
+                return len(self._locations)
+
+            ids = [template_id for shard in self._shards for template_id in shard.ids]
+            rows = (
+                np.concatenate(
+                    [shard.matrix[: shard.count] for shard in self._shards]
+                )
+                if ids
+                else np.empty((0, self.dim), dtype=np.float32)
+            )
+
+            while len(self._shards) > num_shards:
+                self._shards.pop().stop()
+            while len(self._shards) < num_shards:
+                self._shards.append(
+                    _GalleryShard(self._context, self.dim, self.shard_capacity)
+                )
+
+            self._locations = {}
+            bounds = np.linspace(0, len(ids), num_shards + 1).astype(int)
+            for shard_index, shard in enumerate(self._shards):
+                start, end = bounds[shard_index], bounds[shard_index + 1]
+                shard.ids = []
+                shard.ensure_capacity(end - start)
+                shard.matrix[: end - start] = rows[start:end]
+                shard.ids = ids[start:end]
+                for row_index, template_id in enumerate(shard.ids):
+                    self._locations[template_id] = (shard_index, row_index)
+
+            self.num_shards = num_shards
+            logger.info(
+                f"🔀 Gallery rebalanced: {len(ids)} templates over {num_shards} shards"
+            )
+            return len(self._locations)
+
+    def close(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.stop()
+            self._shards = []
+            self._locations = {}
+
+    def get_gallery_info(self) -> dict:
+        """Get information about the gallery and its shards"""
+        with self._lock:
+            return {
+                "templates": len(self._locations),
+                "num_shards": self.num_shards,
+                "embedding_size": self.dim,
+                "shard_sizes": [shard.count for shard in self._shards],
+                "running": bool(self._shards),
+            }
@@ -0,0 +1,376 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config.settings import settings
+from ..utils.image_utils import estimate_sharpness
+from ..utils.local_ingest import decode_image_file
+from .face_detector import FaceDetector
+from .face_recognizer import FaceRecognizer
+from .qos import QoSTier
+
+logger = logging.getLogger(__name__)
+
+
+def decode_image_bytes(image_data: bytes) -> Optional[np.ndarray]:
+    """Decode an encoded image (JPEG/PNG/...) to a BGR array"""
+    return cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def burst_settled(similarities: List[float], is_match: bool) -> bool:
+    """
+    Whether a burst can stop early: the last frame matched, or the mean
+    similarity of enough frames is confidently below the rejection level
+    """
+    if is_match:
+        return True
+
+    return (
+        len(similarities) >= settings.BURST_MIN_FRAMES_FOR_REJECT
+        and float(np.mean(similarities)) < settings.BURST_REJECT_SIMILARITY
+    )
+
+
+def burst_result(
+    similarities: List[float], frames_used: int, total_frames: int, message: str
+) -> Tuple[bool, Optional[float], Optional[bool], str, int]:
+    """Summarize a burst by its best frame"""
+    if not similarities:
+        return False, None, None, message, frames_used
+
+    best_similarity = max(similarities)
+    is_match = best_similarity >= settings.FACE_CONFIDENCE_THRESHOLD
+
+    logger.info(
+        f"🎞️ Burst verification: frames_used={frames_used}/{total_frames}, "
+        f"best={best_similarity:.3f}, match={is_match}"
+    )
+
+    message = (
+        f"Similarity: {best_similarity:.3f}, Match: {'Yes' if is_match else 'No'} "
+        f"({frames_used} of {total_frames} frames used)"
+    )
+
+    return True, best_similarity, is_match, message, frames_used
+
+
+class PipelineStage:
+    """
+    A pool of worker threads fed by a bounded queue.
+
+    Coroutines wait for a free slot before enqueueing, so a slow stage
+    applies backpressure to the stages in front of it instead of letting its
+    queue grow without limit.
+    """
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = max(workers, 1)
+        self.queue_size = max(queue_size, 1)
+        self._queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._busy_seconds = 0.0
+        self._completed = 0
+        self._started_at = time.monotonic()
+        self._threads = [
+            threading.Thread(
+                target=self._work, name=f"pipeline-{name}-{i}", daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    async def run(self, fn: Callable, *args):
+        """Run fn(*args) on this stage's workers and await the result"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.queue_size)
+
+        async with self._slots:
+            future: Future = Future()
+            self._queue.put_nowait((future, fn, args))
+            return await asyncio.wrap_future(future)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            future, fn, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started = time.monotonic()
+            try:
+                result, error = fn(*args), None
+            except BaseException as e:
+                result, error = None, e
+
+            # Count the job before resolving it, so a caller that reads the
+            # metrics right after awaiting sees its own job
+            with self._lock:
+                self._busy_seconds += time.monotonic() - started
+                self._completed += 1
+
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+
+    def get_metrics(self) -> dict:
+        """Get worker count, queue length and utilization since start"""
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at
+            return {
+                "workers": self.workers,
+                "queue_length": self._queue.qsize(),
+                "queue_capacity": self.queue_size,
+                "completed": self._completed,
+                "utilization": round(
+                    self._busy_seconds / max(elapsed * self.workers, 1e-9), 4
+                ),
+            }
+
+
+class InferencePipeline:
+    """
+    Runs decode/preprocess, detection and embedding on separate worker pools
+    so the stages of concurrent requests overlap. Each stage can be sized to
+    its CPU cost through the PIPELINE_* settings.
+    """
+
+    def __init__(self, face_recognizer: FaceRecognizer):
+        self.recognizer = face_recognizer
+        self._local = threading.local()
+        self.decode = PipelineStage(
+            "decode", settings.PIPELINE_DECODE_WORKERS, settings.PIPELINE_QUEUE_SIZE
+        )
+        self.detect = PipelineStage(
+            "detect", settings.PIPELINE_DETECT_WORKERS, settings.PIPELINE_QUEUE_SIZE
+        )
+        self.embed = PipelineStage(
+            "embed", settings.PIPELINE_EMBED_WORKERS, settings.PIPELINE_QUEUE_SIZE
+        )
+        self.stages = [self.decode, self.detect, self.embed]
+
+    def _face_detector(self) -> FaceDetector:
+        # MediaPipe graphs are not thread-safe; keep one per detect worker
+        detector = getattr(self._local, "face_detector", None)
+        if detector is None:
+            detector = self._local.face_detector = FaceDetector()
+        return detector
+
+    async def decode_image(self, image_data: bytes) -> Optional[np.ndarray]:
+        return await self.decode.run(decode_image_bytes, image_data)
+
+    async def decode_file(self, path: Path) -> Optional[np.ndarray]:
+        return await self.decode.run(decode_image_file, path)
+
+    def _detect_with_mediapipe(
+        self, image: np.ndarray, tier: Optional[QoSTier], hint: Optional[dict]
+    ) -> Tuple[bool, Optional[float], Optional[dict], str, int, bool]:
+        detector = self._face_detector()
+
+        if hint is not None:
+            result = detector.detect_faces_in_roi(image, hint, tier)
+            if result[0]:
+                return result + (True,)
+            logger.info("🔁 Nothing found inside the face hint, using the full frame")
+
+        success, confidence, bounding_box, message = detector.detect_faces(image, tier)
+        faces_detected = detector.get_face_count(image, tier)
+        return success, confidence, bounding_box, message, faces_detected, False
+
+    async def detect_face(
+        self,
+        image: np.ndarray,
+        tier: Optional[QoSTier] = None,
+        hint: Optional[dict] = None,
+    ) -> Tuple[bool, Optional[float], Optional[dict], str, int, bool]:
+        """
+        MediaPipe detection on the detect stage, inside the padded hint
+        region first when a face hint is given
+
+        Returns:
+            - success, confidence, bounding_box, message (as FaceDetector.detect_faces)
+            - faces_detected: int
+            - hint_used: bool (False when it fell back to the full frame)
+        """
+        return await self.detect.run(self._detect_with_mediapipe, image, tier, hint)
+
+    async def generate_embedding(
+        self,
+        image: np.ndarray,
+        tier: Optional[QoSTier] = None,
+        hint: Optional[dict] = None,
+    ) -> Tuple[
+        bool,
+        Optional[np.ndarray],
+        Optional[float],
+        Optional[np.ndarray],
+        str,
+        Optional[bool],
+    ]:
+        """
+        Generate a face embedding, using the QoS tier's image and detector
+        sizes when one is given, inside the padded hint region first when a
+        face hint is given
+
+        Returns:
+            - success: bool
+            - embedding: Optional[np.ndarray]
+            - confidence: Optional[float]
+            - crop: Optional[np.ndarray] (aligned RGB crop, None for mock embeddings)
+            - message: str
+            - hint_used: Optional[bool] (False when it fell back to the full
+              frame, None for mock embeddings, where no detection runs)
+        """
+        try:
+            rgb_image = await self.decode.run(self.recognizer.prepare_image, image, tier)
+
+            if rgb_image is None:
+                return False, None, None, None, "Invalid image provided", False
+
+            if self.recognizer.app is None:
+                # No detection runs, so the hint was neither used nor rejected
+                return self.recognizer.mock_embedding() + (None,)
+
+            best_face = None
+            if hint is not None:
+                best_face = await self.detect.run(
+                    self.recognizer.detect_face_in_hint,
+                    rgb_image,
+                    hint,
+                    rgb_image.shape[1] / image.shape[1],
+                )
+            hint_used = best_face is not None
+
+            if best_face is None:
+                best_face = await self.detect.run(
+                    self.recognizer.detect_best_face, rgb_image, tier
+                )
+
+            if best_face is None:
+                return False, None, None, None, "No faces detected in image", False
+
+            embedding, crop = await self.embed.run(
+                self.recognizer.embed_face, rgb_image, best_face
+            )
+
+            if embedding is None:
+                return (
+                    False,
+                    None,
+                    None,
+                    None,
+                    "Failed to extract face embedding",
+                    hint_used,
+                )
+
+            return (
+                True,
+                embedding,
+                float(best_face.det_score),
+                crop,
+                "Face embedding generated successfully",
+                hint_used,
+            )
+
+        except Exception as e:
+            logger.error(f"❌ Embedding generation error: {str(e)}")
+            return (
+                False,
+                None,
+                None,
+                None,
+                f"Embedding generation failed: {str(e)}",
+                False,
+            )
+
+    async def verify_face_burst(
+        self,
+        images: List[np.ndarray],
+        stored_embedding: np.ndarray,
+        tier: Optional[QoSTier] = None,
+        hint: Optional[dict] = None,
+    ) -> Tuple[bool, Optional[float], Optional[bool], str, int, Optional[bool]]:
+        """
+        Verify a burst of frames against stored embedding, sharpest frame first
+        (sharpness is scored in parallel on the decode stage). Stops at the
+        first matching frame, or once the mean similarity of the frames seen
+        so far is confidently below the rejection level. The face hint applies
+        to every frame.
+
+        Returns:
+            - success: bool
+            - similarity: Optional[float] (best frame similarity)
+            - is_match: Optional[bool]
+            - message: str
+            - frames_used: int
+            - hint_used: Optional[bool] (True only if no frame fell back to the
+              full frame, None if no frame ran detection)
+        """
+        sharpness = await asyncio.gather(
+            *(self.decode.run(estimate_sharpness, image) for image in images)
+        )
+        ordered = [
+            image
+            for _, image in sorted(
+                zip(sharpness, images), key=lambda pair: pair[0], reverse=True
+            )
+        ]
+
+        similarities = []
+        frames_used = 0
+        frame_hints = []
+        message = "No valid frames provided"
+
+        for image in ordered:
+            frames_used += 1
+            success, embedding, _, _, message, frame_hint_used = (
+                await self.generate_embedding(image, tier, hint)
+            )
+            if frame_hint_used is not None:
+                frame_hints.append(frame_hint_used)
+
+            if not success or embedding is None:
+                continue
+
+            comp_success, similarity, is_match, message = (
+                self.recognizer.compare_embeddings(embedding, stored_embedding)
+            )
+
+            if not comp_success:
+                continue
+
+            similarities.append(similarity)
+
+            if burst_settled(similarities, is_match):
+                break
+
+        hint_used = all(frame_hints) if frame_hints else None
+        return burst_result(similarities, frames_used, len(images), message) + (
+            hint_used,
+        )
+
+    def close(self):
+        for stage in self.stages:
+            stage.close()
+
+    def get_metrics(self) -> dict:
+        """Get per-stage utilization and queue length"""
+        return {stage.name: stage.get_metrics() for stage in self.stages}
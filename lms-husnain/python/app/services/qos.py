@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QoSTier:
+    """Processing parameters for one quality-of-service level"""
+
+    name: str
+    max_image_size: int
+    det_size: int
+
+
+@dataclass
+class QoSTicket:
+    """Handed out per request so its latency can be recorded on completion"""
+
+    tier: QoSTier
+    started_at: float
+
+
+def default_tiers() -> List[QoSTier]:
+    """Full quality first, followed by the configured degraded tiers"""
+    tiers = [QoSTier("full", settings.MAX_IMAGE_SIZE, settings.DETECTION_SIZE)]
+    for level, (max_image_size, det_size) in enumerate(
+        zip(settings.QOS_DEGRADED_IMAGE_SIZES, settings.QOS_DEGRADED_DET_SIZES),
+        start=1,
+    ):
+        tiers.append(QoSTier(f"degraded-{level}", max_image_size, det_size))
+    return tiers
+
+
+class QoSController:
+    """
+    Picks a processing tier from the number of in-flight requests and an
+    exponentially weighted average of request latency.
+
+    Steps down one tier while under pressure and back up once load falls,
+    waiting at least QOS_MIN_DWELL_SECONDS between changes.
+    """
+
+    def __init__(self, tiers: Optional[List[QoSTier]] = None):
+        self.tiers = tiers or default_tiers()
+        self._lock = threading.Lock()
+        self._level = 0
+        self._in_flight = 0
+        self._latency_ewma_ms = 0.0
+        self._changed_at = time.monotonic()
+        self._tier_seconds = {tier.name: 0.0 for tier in self.tiers}
+        self._tier_requests = {tier.name: 0 for tier in self.tiers}
+
+    @property
+    def current_tier(self) -> QoSTier:
+        return self.tiers[self._level]
+
+    def begin(self) -> QoSTicket:
+        """Register a new request and return the tier it should use"""
+        with self._lock:
+            self._in_flight += 1
+            self._evaluate()
+            tier = self.current_tier
+            self._tier_requests[tier.name] += 1
+            return QoSTicket(tier=tier, started_at=time.monotonic())
+
+    def end(self, ticket: QoSTicket):
+        """Record a finished request's latency"""
+        latency_ms = (time.monotonic() - ticket.started_at) * 1000
+        alpha = settings.QOS_LATENCY_SMOOTHING
+
+        with self._lock:
+            self._in_flight -= 1
+            self._latency_ewma_ms = (
+                alpha * latency_ms + (1 - alpha) * self._latency_ewma_ms
+            )
+            self._evaluate()
+
+    def _evaluate(self):
+        now = time.monotonic()
+        if not settings.QOS_ENABLED:
+            target = 0
+        elif now - self._changed_at < settings.QOS_MIN_DWELL_SECONDS:
+            return
+        elif (
+            self._in_flight > settings.QOS_QUEUE_HIGH
+            or self._latency_ewma_ms > settings.QOS_LATENCY_HIGH_MS
+        ):
+            target = min(self._level + 1, len(self.tiers) - 1)
+        elif (
+            self._in_flight <= settings.QOS_QUEUE_LOW
+            and self._latency_ewma_ms < settings.QOS_LATENCY_LOW_MS
+        ):
+            target = max(self._level - 1, 0)
+        else:
+            return
+
+        if target == self._level:
+            return
+
+        self._tier_seconds[self.current_tier.name] += now - self._changed_at
+        previous = self.current_tier.name
+        self._level = target
+        self._changed_at = now
+
+        logger.warning(
+            f"⚖️ QoS tier {previous} -> {self.current_tier.name} "
+            f"(in_flight={self._in_flight}, latency_ewma={self._latency_ewma_ms:.0f}ms)"
+        )
+
+    def get_metrics(self) -> dict:
+        """Get the current tier, load signals and time spent in each tier"""
+        with self._lock:
+            seconds = dict(self._tier_seconds)
+            seconds[self.current_tier.name] += time.monotonic() - self._changed_at
+
+            return {
+                "enabled": settings.QOS_ENABLED,
+                "current_tier": self.current_tier.name,
+                "in_flight": self._in_flight,
+                "latency_ewma_ms": round(self._latency_ewma_ms, 2),
+                "tiers": {
+                    tier.name: {
+                        "max_image_size": tier.max_image_size,
+                        "det_size": tier.det_size,
+                        "seconds": round(seconds[tier.name], 3),
+                        "requests": self._tier_requests[tier.name],
+                    }
+                    for tier in self.tiers
+                },
+            }
@@ -1,6 +1,6 @@
 import cv2
 import numpy as np
-from typing import Optional
+from typing import Optional, Tuple
 
 def resize_image(image: np.ndarray, max_size: int) -> np.ndarray:
     """
@@ -32,6 +32,46 @@ def convert_to_rgb(image: np.ndarray) -> np.ndarray:
         return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
     return image
 
+def estimate_sharpness(image: np.ndarray, max_size: int = 256) -> float:
+    """
+    Estimate frame sharpness as the variance of the Laplacian on a small grayscale copy
+    """
+    small = resize_image(image, max_size)
+    if len(small.shape) == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return float(cv2.Laplacian(small, cv2.CV_64F).var())
+
+def padded_roi(
+    image_shape: Tuple[int, ...], box: dict, padding: float
+) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Grow an {x, y, width, height} box by padding times its size on every side
+    and clip it to the image. Returns (x0, y0, x1, y1), or None if the box
+    does not overlap the image or is not finite
+    """
+    if not np.all(np.isfinite([box[key] for key in ("x", "y", "width", "height")])):
+        return None
+
+    h, w = image_shape[:2]
+    pad_x = box["width"] * padding
+    pad_y = box["height"] * padding
+
+    x0 = max(int(box["x"] - pad_x), 0)
+    y0 = max(int(box["y"] - pad_y), 0)
+    x1 = min(int(box["x"] + box["width"] + pad_x), w)
+    y1 = min(int(box["y"] + box["height"] + pad_y), h)
+
+    if x1 <= x0 or y1 <= y0:
+        return None
+
+    return x0, y0, x1, y1
+
+def scale_box(box: dict, scale: float) -> dict:
+    """
+    Scale an {x, y, width, height} box, e.g. after the image was resized
+    """
+    return {key: box[key] * scale for key in ("x", "y", "width", "height")}
+
 def validate_image(image: np.ndarray) -> bool:
     """
     Validate if image is proper numpy array
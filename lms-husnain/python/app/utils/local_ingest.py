@@ -0,0 +1,65 @@
+import mmap
+import os
+import stat
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+# POSIX shared-memory segments are files under this directory on Linux
+SHM_DIR = Path("/dev/shm")
+
+
+def resolve_local_image(
+    image_path: Optional[str], shm_name: Optional[str], allowed_dirs: List[str]
+) -> Path:
+    """
+    Resolve a path or shared-memory segment reference to a readable file.
+    Raises ValueError for malformed references and PermissionError for paths
+    (or segments) that resolve outside the allowed directories.
+    """
+    if (image_path is None) == (shm_name is None):
+        raise ValueError("Provide exactly one of image_path or shm_name")
+
+    if shm_name is not None:
+        if not shm_name or "/" in shm_name or shm_name in (".", ".."):
+            raise ValueError("Invalid shared-memory segment name")
+
+        # Any local process can plant a symlink in /dev/shm, so resolve it too
+        shm_dir = SHM_DIR.resolve()
+        path = (shm_dir / shm_name).resolve()
+        if path.parent != shm_dir:
+            raise PermissionError("Shared-memory segment resolves outside of /dev/shm")
+        return path
+
+    # resolve() follows symlinks, so links cannot escape the allowed directories
+    path = Path(image_path).resolve()
+    for allowed_dir in allowed_dirs:
+        if path.is_relative_to(Path(allowed_dir).resolve()):
+            return path
+
+    raise PermissionError("Image path is outside the allowed ingest directories")
+
+
+def decode_image_file(path: Path) -> Optional[np.ndarray]:
+    """
+    Decode an image file by memory-mapping it, without reading it into a
+    Python bytes object first. Only regular files are read: a symlink swapped
+    in after resolve_local_image fails to open, and FIFOs or devices (which
+    would block a decode worker) are rejected with ValueError.
+    """
+    fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW | os.O_NONBLOCK)
+    with open(fd, "rb") as file:
+        info = os.fstat(file.fileno())
+        if not stat.S_ISREG(info.st_mode):
+            raise ValueError("Image reference is not a regular file")
+        if info.st_size == 0:
+            return None
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            buffer = np.frombuffer(mapped, np.uint8)
+            image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+            del buffer  # Release the view before the mapping is closed
+
+    return image
@@ -0,0 +1,76 @@
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+
+def top_k_similarities(
+    matrix: np.ndarray, query: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return row indices and cosine scores of the k rows most similar to query.
+    Rows and query are expected to be L2-normalized.
+    """
+    if matrix.shape[0] == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    scores = matrix @ query
+    k = min(k, scores.shape[0])
+
+    # Partial selection first, then sort only the k winners
+    indices = np.argpartition(-scores, k - 1)[:k]
+    indices = indices[np.argsort(-scores[indices])]
+
+    return indices, scores[indices]
+
+
+def run_shard_worker(conn) -> None:
+    """
+    Serve top-k searches over one gallery shard held in shared memory.
+
+    Commands received on conn, each answered with (request_id, result):
+        - ("attach", request_id, name, capacity, dim): map a (new)
+          shared-memory matrix
+        - ("search", request_id, query, k, count): search the first count rows
+        - ("stop", request_id): detach and exit, without a reply
+    """
+    shm = None
+    matrix = None
+
+    # One BLAS thread per shard, so shards scale across cores instead of
+    # oversubscribing them
+    threadpool_limits(limits=1)
+
+    try:
+        while True:
+            command, request_id, *args = conn.recv()
+
+            if command == "attach":
+                name, capacity, dim = args
+                matrix = None
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=name)
+                matrix = np.ndarray((capacity, dim), dtype=np.float32, buffer=shm.buf)
+                conn.send((request_id, True))
+
+            elif command == "search":
+                query, k, count = args
+                if matrix is None:
+                    result = top_k_similarities(np.empty((0, 0)), query, k)
+                else:
+                    result = top_k_similarities(matrix[:count], query, k)
+                conn.send((request_id, result))
+
+            elif command == "stop":
+                break
+
+    except (EOFError, KeyboardInterrupt):
+        pass
+
+    finally:
+        matrix = None
+        if shm is not None:
+            shm.close()
+        conn.close()
@@ -0,0 +1,73 @@
+"""
+Gallery search benchmark.
+
+Measures top-k search latency of the sharded embedding gallery, and the
+duplicate-enrollment screen built on it, for several gallery sizes and
+shard counts, using random unit embeddings.
+
+Usage (from the python/ directory):
+    python -m benchmarks.benchmark_gallery --sizes 10000 100000 --shards 1 2 4
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.gallery import ShardedGallery
+
+
+def benchmark(size: int, shards: int, queries: int, top_k: int, dim: int = 512):
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((size, dim)).astype(np.float32)
+    probes = rng.standard_normal((queries, dim)).astype(np.float32)
+
+    gallery = ShardedGallery(num_shards=shards, dim=dim, shard_capacity=size // shards + 1)
+    try:
+        gallery.upsert([f"user-{i}" for i in range(size)], embeddings)
+        gallery.search(probes[0], top_k)  # Warm up workers
+
+        search_latencies, screen_latencies = [], []
+        for i, probe in enumerate(probes):
+            start = time.perf_counter()
+            gallery.search(probe, top_k)
+            search_latencies.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            gallery.find_duplicates(probe, exclude_id=f"user-{i}", top_k=top_k)
+            screen_latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        gallery.close()
+
+    return [
+        np.percentile(latencies, percentile)
+        for latencies in (search_latencies, screen_latencies)
+        for percentile in (50, 95)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'templates':>10} {'shards':>6} {'search p50':>10} {'p95':>8} "
+        f"{'screen p50':>10} {'p95':>8}"
+    )
+    for size in args.sizes:
+        for shards in args.shards:
+            search_p50, search_p95, screen_p50, screen_p95 = benchmark(
+                size, shards, args.queries, args.top_k
+            )
+            print(
+                f"{size:>10} {shards:>6} {search_p50:>10.2f} {search_p95:>8.2f} "
+                f"{screen_p50:>10.2f} {screen_p95:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
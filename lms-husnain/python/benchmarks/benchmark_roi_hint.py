@@ -0,0 +1,102 @@
+"""
+Face ROI hint benchmark.
+
+Measures detection latency with and without a client-supplied face hint,
+for the MediaPipe detector and (when its models are available) the
+InsightFace detector. The hint for each image is the face box found by a
+full-frame MediaPipe pass, as a browser-side detector would send it.
+
+Usage (from the python/ directory):
+    python -m benchmarks.benchmark_roi_hint --images ../uploads --repeats 20
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from app.services.face_detector import FaceDetector
+from app.services.face_recognizer import FaceRecognizer
+from app.services.qos import QoSTier
+
+
+def measure(fn, repeats: int):
+    fn()  # Warm up
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def load_images(pattern_dir: str):
+    images = []
+    for path in sorted(glob.glob(os.path.join(pattern_dir, "*"))):
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is not None:
+            images.append((os.path.basename(path), image))
+    return images
+
+
+def find_hint(detector: FaceDetector, image: np.ndarray):
+    # A tier at the native size, so the box is in original image pixels
+    native = QoSTier("native", max(image.shape[:2]), 0)
+    success, _, bounding_box, _ = detector.detect_faces(image, native)
+    return bounding_box if success else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", default="../uploads")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    detector = FaceDetector()
+    recognizer = FaceRecognizer()
+
+    results = {}
+    for name, image in load_images(args.images):
+        hint = find_hint(detector, image)
+        if hint is None:
+            print(f"skipping {name}: no face found for the hint")
+            continue
+
+        def mediapipe_full():
+            detector.detect_faces(image)
+            detector.get_face_count(image)
+
+        runs = [
+            ("mediapipe", "full", mediapipe_full),
+            ("mediapipe", "hint", lambda: detector.detect_faces_in_roi(image, hint)),
+        ]
+
+        if recognizer.app is not None:
+            rgb_image = recognizer.prepare_image(image)
+            scale = rgb_image.shape[1] / image.shape[1]
+            runs += [
+                ("insightface", "full", lambda: recognizer.detect_best_face(rgb_image)),
+                (
+                    "insightface",
+                    "hint",
+                    lambda: recognizer.detect_face_in_hint(rgb_image, hint, scale),
+                ),
+            ]
+
+        for model, mode, fn in runs:
+            results.setdefault((model, mode), []).extend(measure(fn, args.repeats))
+
+    if recognizer.app is None:
+        print("InsightFace models not available; reporting MediaPipe only")
+
+    print(f"{'detector':>12} {'mode':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for (model, mode), latencies in results.items():
+        p50, p95 = np.percentile(latencies, 50), np.percentile(latencies, 95)
+        print(f"{model:>12} {mode:>5} {p50:>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
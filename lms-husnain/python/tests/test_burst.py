@@ -0,0 +1,103 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.config.settings import settings
+from app.services.face_recognizer import FaceRecognizer
+from app.services.pipeline import InferencePipeline, burst_result, burst_settled
+
+STORED = np.array([1.0, 0.0], dtype=np.float32)
+MATCH = np.array([1.0, 0.0], dtype=np.float32)
+NEAR_MISS = np.array([0.3, np.sqrt(1 - 0.3**2)], dtype=np.float32)
+STRANGER = np.array([0.0, 1.0], dtype=np.float32)
+
+
+def frame(block: int) -> np.ndarray:
+    """A checkerboard frame; smaller blocks give a sharper frame"""
+    y, x = np.indices((64, 64))
+    board = ((x // block + y // block) % 2 * 255).astype(np.uint8)
+    return np.dstack([board] * 3)
+
+
+SHARP, MEDIUM, BLURRY = frame(1), frame(8), np.full((64, 64, 3), 128, np.uint8)
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = InferencePipeline(FaceRecognizer.__new__(FaceRecognizer))
+    yield pipeline
+    pipeline.close()
+
+
+def run_burst(pipeline, frames):
+    """Verify (image, embedding) frames; returns the result and the visit order"""
+    embeddings = {id(image): embedding for image, embedding in frames}
+    visited = []
+
+    async def generate_embedding(image, tier=None, hint=None):
+        visited.append(id(image))
+        return True, embeddings[id(image)], 0.9, None, "ok", None
+
+    pipeline.generate_embedding = generate_embedding
+    result = asyncio.run(
+        pipeline.verify_face_burst([image for image, _ in frames], STORED)
+    )
+    return result, visited
+
+
+@pytest.fixture(autouse=True)
+def burst_settings(monkeypatch):
+    monkeypatch.setattr(settings, "BURST_MIN_FRAMES_FOR_REJECT", 2)
+    monkeypatch.setattr(settings, "BURST_REJECT_SIMILARITY", 0.2)
+    monkeypatch.setattr(settings, "FACE_CONFIDENCE_THRESHOLD", 0.5)
+
+
+def test_match_settles_immediately():
+    assert burst_settled([0.9], True)
+
+
+def test_single_low_frame_does_not_settle():
+    assert not burst_settled([0.05], False)
+
+
+def test_enough_low_frames_settle_as_reject():
+    assert burst_settled([0.1, 0.1], False)
+
+
+def test_mean_at_reject_level_keeps_going():
+    assert not burst_settled([0.3, 0.1], False)
+
+
+def test_result_uses_best_frame():
+    success, similarity, is_match, message, frames_used = burst_result(
+        [0.3, 0.7], 2, 5, "unused"
+    )
+    assert (success, similarity, is_match, frames_used) == (True, 0.7, True, 2)
+    assert "2 of 5 frames" in message
+
+
+def test_result_without_similarities_keeps_last_message():
+    assert burst_result([], 3, 3, "No faces detected") == (
+        False,
+        None,
+        None,
+        "No faces detected",
+        3,
+    )
+
+
+def test_burst_visits_sharpest_frame_first_and_stops_on_match(pipeline):
+    (success, _, is_match, _, frames_used, _), visited = run_burst(
+        pipeline, [(BLURRY, MATCH), (SHARP, NEAR_MISS), (MEDIUM, MATCH)]
+    )
+    assert visited == [id(SHARP), id(MEDIUM)]
+    assert (success, is_match, frames_used) == (True, True, 2)
+
+
+def test_burst_rejects_early_once_confidently_below(pipeline):
+    (success, similarity, is_match, _, frames_used, _), _ = run_burst(
+        pipeline, [(SHARP, STRANGER), (MEDIUM, STRANGER), (BLURRY, MATCH)]
+    )
+    assert (success, is_match, frames_used) == (True, False, 2)
+    assert similarity == pytest.approx(0.0, abs=1e-6)
@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.jobs import reembed
+from app.services.crop_archive import CropArchive, decode_crop
+
+# Any ONNX recognition model works; fakepack is a small one for tests
+MODEL = "fakepack"
+
+
+def crop(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (112, 112, 3), np.uint8)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = CropArchive(str(tmp_path / "crops.sqlite3"))
+    for index in range(5):
+        archive.put(f"u{index}", crop(index))
+    yield archive
+    archive.close()
+
+
+def test_put_stores_lossless_crops(archive):
+    archive.put("u1", crop(10))
+    assert archive.count() == 5
+
+    rows = dict(row for batch in archive.iter_batches(10) for row in batch)
+    assert np.array_equal(decode_crop(rows["u1"]), crop(10))
+    assert np.array_equal(decode_crop(rows["u4"]), crop(4))
+
+
+def test_iter_batches_pages_in_user_id_order(archive):
+    def user_ids(batches):
+        return [[user_id for user_id, _ in batch] for batch in batches]
+
+    assert user_ids(archive.iter_batches(2)) == [["u0", "u1"], ["u2", "u3"], ["u4"]]
+    assert user_ids(archive.iter_batches(2, after="u2")) == [["u3", "u4"]]
+
+
+@pytest.fixture
+def job(archive, tmp_path):
+    if not (Path.home() / ".insightface" / "models" / MODEL).exists():
+        pytest.skip(f"{MODEL} model pack is not installed")
+
+    output = tmp_path / "out" / "embeddings.jsonl"
+
+    def run(**kwargs):
+        return reembed.run(str(archive.path), str(output), MODEL, 1, 2, **kwargs)
+
+    return run, output
+
+
+def test_run_writes_one_line_per_user_and_checkpoints(job):
+    run, output = job
+    state = run()
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["userId"] for line in lines] == ["u0", "u1", "u2", "u3", "u4"]
+    assert all(len(line["faceEmbedding"]) > 0 for line in lines)
+    assert {line["model"] for line in lines} == {MODEL}
+    assert state["processed"] == 5 and state["last_user_id"] == "u4"
+    assert state["output_bytes"] == output.stat().st_size
+
+
+def test_resume_truncates_lines_after_the_checkpoint(job):
+    run, output = job
+    run()
+    complete = output.read_bytes()
+    first_window = b"".join(complete.splitlines(keepends=True)[:4])
+
+    # A crash after the first window: its checkpoint, plus a half-written line
+    checkpoint = output.with_name(output.name + ".checkpoint")
+    checkpoint.write_text(
+        json.dumps(
+            {
+                "model": MODEL,
+                "last_user_id": "u3",
+                "processed": 4,
+                "output_bytes": len(first_window),
+            }
+        )
+    )
+    output.write_bytes(first_window + b'{"userId": "u4", "faceEmb')
+
+    state = run()
+    assert output.read_bytes() == complete
+    assert state["processed"] == 5
+
+
+def test_checkpoint_for_another_model_needs_restart(job):
+    run, output = job
+    run()
+    checkpoint = output.with_name(output.name + ".checkpoint")
+    state = json.loads(checkpoint.read_text())
+    checkpoint.write_text(json.dumps(dict(state, model="old")))
+
+    with pytest.raises(SystemExit):
+        run()
+
+    assert run(restart=True)["processed"] == 5
+    assert len(output.read_text().splitlines()) == 5
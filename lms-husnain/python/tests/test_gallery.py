@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from app.services.gallery import ShardedGallery
+from app.utils.shard_worker import top_k_similarities
+
+E = np.eye(4, dtype=np.float32)
+IDS = ["u0", "u1", "u2", "u3"]
+
+
+@pytest.fixture
+def gallery():
+    # Capacity 1 makes every shard grow (and re-attach) while filling
+    gallery = ShardedGallery(num_shards=2, dim=4, shard_capacity=1)
+    gallery.upsert(IDS, E)
+    yield gallery
+    gallery.close()
+
+
+def best_match(gallery, embedding):
+    return gallery.search(embedding, top_k=1)[0][0]
+
+
+def test_top_k_similarities_orders_best_first():
+    matrix = np.array([[1, 0], [0.6, 0.8], [0, 1]], dtype=np.float32)
+    indices, scores = top_k_similarities(matrix, np.array([1, 0], np.float32), 2)
+    assert indices.tolist() == [0, 1]
+    assert scores.tolist() == pytest.approx([1.0, 0.6])
+
+
+def test_top_k_similarities_caps_k_and_handles_empty():
+    matrix = np.eye(2, dtype=np.float32)
+    indices, _ = top_k_similarities(matrix, matrix[1], 10)
+    assert indices.tolist() == [1, 0]
+    assert top_k_similarities(matrix, matrix[0], 0)[0].size == 0
+    assert top_k_similarities(np.empty((0, 2)), matrix[0], 3)[0].size == 0
+
+
+def test_search_merges_shards(gallery):
+    assert gallery.get_gallery_info()["shard_sizes"] == [2, 2]
+    results = gallery.search(E[2] + 0.5 * E[1], top_k=2)
+    assert [template_id for template_id, _ in results] == ["u2", "u1"]
+    for template_id, embedding in zip(IDS, E):
+        assert best_match(gallery, embedding) == template_id
+
+
+def test_upsert_replaces_existing_template(gallery):
+    assert gallery.upsert(["u0"], E[3]) == 4
+    similarities = dict(gallery.search(E[3], top_k=4))
+    assert similarities["u0"] == pytest.approx(1.0)
+    assert similarities["u3"] == pytest.approx(1.0)
+    assert dict(gallery.search(E[0], top_k=4))["u0"] == pytest.approx(0.0)
+
+
+def test_remove_keeps_moved_rows_searchable(gallery):
+    assert gallery.remove("u0")
+    assert not gallery.remove("u0")
+    assert gallery.get_gallery_info()["templates"] == 3
+    for template_id, embedding in zip(IDS[1:], E[1:]):
+        assert best_match(gallery, embedding) == template_id
+
+
+@pytest.mark.parametrize("num_shards", [1, 3])
+def test_resize_keeps_every_template(gallery, num_shards):
+    assert gallery.resize(num_shards) == 4
+    assert len(gallery.get_gallery_info()["shard_sizes"]) == num_shards
+    for template_id, embedding in zip(IDS, E):
+        assert best_match(gallery, embedding) == template_id
+
+
+def test_dead_worker_is_replaced(gallery):
+    dead = gallery._shards[1]
+    dead.process.kill()
+    dead.process.join()
+
+    for _ in range(2):
+        for template_id, embedding in zip(IDS, E):
+            assert best_match(gallery, embedding) == template_id
+    assert dead.process.is_alive()
+
+    gallery.resize(1)
+    assert best_match(gallery, E[3]) == "u3"
+
+
+def test_stale_reply_is_dropped(gallery):
+    # A query abandoned halfway leaves its reply in the pipe
+    shard = gallery._shards[0]
+    shard.send("search", E[0], 1, shard.count)
+    for template_id, embedding in zip(IDS, E):
+        assert best_match(gallery, embedding) == template_id
+
+
+def test_find_duplicates_skips_own_template_and_applies_threshold(gallery):
+    # u0 and u1 are both close to the query; u2 is well below the threshold
+    query = E[0] + 0.9 * E[1] + 0.3 * E[2]
+    matches = gallery.find_duplicates(query, exclude_id="u0", threshold=0.5, top_k=5)
+    assert [template_id for template_id, _ in matches] == ["u1"]
+
+    matches = gallery.find_duplicates(query, threshold=0.5, top_k=5)
+    assert [template_id for template_id, _ in matches] == ["u0", "u1"]
+
+
+def test_find_duplicates_keeps_top_k_after_excluding_own_template(gallery):
+    query = E[0] + 0.9 * E[1]
+    matches = gallery.find_duplicates(query, exclude_id="u0", threshold=0.0, top_k=2)
+    assert len(matches) == 2 and "u0" not in dict(matches)
+
+
+def test_screen_reports_templates_screened_without_registering(gallery, monkeypatch):
+    from app.api import routes
+
+    monkeypatch.setattr(routes, "gallery", gallery)
+    duplicates, templates_screened = routes._screen_duplicates(E[2], "new-user")
+
+    assert templates_screened == 4
+    assert [match.template_id for match in duplicates] == ["u2"]
+    assert gallery.get_gallery_info()["templates"] == 4
+
+
+def test_screen_of_empty_gallery_reports_zero(monkeypatch):
+    from app.api import routes
+
+    empty = ShardedGallery(num_shards=1, dim=4)
+    monkeypatch.setattr(routes, "gallery", empty)
+    try:
+        assert routes._screen_duplicates(E[0], "new-user") == ([], 0)
+    finally:
+        empty.close()
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.config.settings import settings
+from app.services.group_detector import (
+    GroupFaceDetector,
+    suppress_overlaps,
+    tile_origins,
+)
+
+
+@pytest.mark.parametrize("length", [100, 640])
+def test_single_tile_when_image_fits(length):
+    assert tile_origins(length, 640, 0.2) == [0]
+
+
+@pytest.mark.parametrize("length", [641, 1000, 1920, 4032])
+def test_tiles_cover_the_whole_length_with_overlap(length):
+    tile_size, overlap = 640, 0.2
+    origins = tile_origins(length, tile_size, overlap)
+
+    assert origins[0] == 0
+    assert origins[-1] + tile_size == length
+    stride = int(tile_size * (1 - overlap))
+    for previous, current in zip(origins, origins[1:]):
+        assert 0 < current - previous <= stride
+
+
+def test_overlapping_boxes_keep_the_best_score():
+    boxes = np.array([[0, 0, 100, 100], [10, 10, 100, 100]], dtype=np.float32)
+    scores = np.array([0.6, 0.9], dtype=np.float32)
+    assert suppress_overlaps(boxes, scores, 0.5) == [1]
+
+
+def test_face_cut_at_tile_edge_is_suppressed_by_whole_face():
+    # The partial box lies inside the whole face; IoU is low but the overlap
+    # relative to the smaller box is total
+    boxes = np.array([[0, 0, 100, 100], [70, 0, 30, 100]], dtype=np.float32)
+    scores = np.array([0.9, 0.95], dtype=np.float32)
+    assert suppress_overlaps(boxes, scores, 0.5) == [1]
+
+    scores = np.array([0.95, 0.9], dtype=np.float32)
+    assert suppress_overlaps(boxes, scores, 0.5) == [0]
+
+
+def test_disjoint_boxes_are_kept_best_first():
+    boxes = np.array(
+        [[0, 0, 50, 50], [100, 0, 50, 50], [200, 0, 50, 50]], dtype=np.float32
+    )
+    scores = np.array([0.7, 0.9, 0.8], dtype=np.float32)
+    assert suppress_overlaps(boxes, scores, 0.5) == [1, 2, 0]
+
+
+def detection(xmin, ymin, width, height, score):
+    box = SimpleNamespace(xmin=xmin, ymin=ymin, width=width, height=height)
+    return SimpleNamespace(
+        location_data=SimpleNamespace(relative_bounding_box=box), score=[score]
+    )
+
+
+@pytest.fixture
+def detector():
+    detector = GroupFaceDetector()
+    yield detector
+    detector.close()
+
+
+def stub_mediapipe(detector, process):
+    face_detection = SimpleNamespace(process=process)
+    detector._face_detector = lambda: SimpleNamespace(face_detection=face_detection)
+
+
+def test_tile_boxes_map_to_full_image_pixels(detector):
+    results = SimpleNamespace(detections=[detection(0.5, 0.25, 0.1, 0.2, 0.9)])
+    stub_mediapipe(detector, lambda tile: results)
+    tile = np.zeros((200, 400, 3), dtype=np.uint8)
+
+    assert detector._detect(tile, 100, 50) == [(300, 100, 40, 40, 0.9)]
+    # An overview tile at half size covers twice the pixels
+    assert detector._detect(tile, 0, 0, 0.5) == [(400, 100, 80, 80, 0.9)]
+
+
+def test_faces_from_overlapping_tiles_are_merged(detector, monkeypatch):
+    monkeypatch.setattr(settings, "GROUP_TILE_SIZE", 640)
+    monkeypatch.setattr(settings, "GROUP_TILE_OVERLAP", 0.5)
+    monkeypatch.setattr(settings, "GROUP_NMS_OVERLAP", 0.5)
+    image = np.zeros((640, 1280, 3), dtype=np.uint8)
+
+    # One face at x=600..700 in full-image pixels: every tile and the
+    # overview report it, in their own coordinates
+    def detect(tile, x0, y0, scale=1.0):
+        x = 600 - x0
+        if x + 100 <= 0 or x >= tile.shape[1] / scale:
+            return []
+        return [(x0 + x, y0 + 300, 100, 100, 0.5 + x0 / 10000)]
+
+    detector._detect = detect
+    success, faces, tiles, _ = detector.detect_faces(image)
+
+    assert success
+    assert tiles == 4  # Three tiles across plus the overview
+    assert len(faces) == 1
+    assert faces[0]["x"] == 600 and faces[0]["width"] == 100
@@ -0,0 +1,104 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from app.utils import local_ingest
+from app.utils.local_ingest import decode_image_file, resolve_local_image
+
+
+@pytest.fixture
+def shm_dir(tmp_path, monkeypatch):
+    shm_dir = tmp_path / "shm"
+    shm_dir.mkdir()
+    monkeypatch.setattr(local_ingest, "SHM_DIR", shm_dir)
+    return shm_dir
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    allowed = tmp_path / "allowed"
+    outside = tmp_path / "outside"
+    allowed.mkdir()
+    outside.mkdir()
+    (allowed / "face.jpg").write_bytes(b"jpeg")
+    (outside / "secret.jpg").write_bytes(b"jpeg")
+    return allowed, outside
+
+
+def test_path_inside_allowed_dir_resolves(dirs):
+    allowed, _ = dirs
+    path = resolve_local_image(str(allowed / "face.jpg"), None, [str(allowed)])
+    assert path == (allowed / "face.jpg").resolve()
+
+
+def test_dotdot_escape_is_rejected(dirs):
+    allowed, _ = dirs
+    with pytest.raises(PermissionError):
+        resolve_local_image(
+            str(allowed / ".." / "outside" / "secret.jpg"), None, [str(allowed)]
+        )
+
+
+def test_symlink_escape_is_rejected(dirs):
+    allowed, outside = dirs
+    link = allowed / "link.jpg"
+    link.symlink_to(outside / "secret.jpg")
+    with pytest.raises(PermissionError):
+        resolve_local_image(str(link), None, [str(allowed)])
+
+
+def test_sibling_dir_with_shared_prefix_is_rejected(dirs, tmp_path):
+    allowed, _ = dirs
+    sibling = tmp_path / "allowed-other"
+    sibling.mkdir()
+    (sibling / "face.jpg").write_bytes(b"jpeg")
+    with pytest.raises(PermissionError):
+        resolve_local_image(str(sibling / "face.jpg"), None, [str(allowed)])
+
+
+def test_shm_name_resolves_under_shm_dir(shm_dir):
+    assert resolve_local_image(None, "frame-1", []) == shm_dir.resolve() / "frame-1"
+
+
+def test_shm_symlink_escape_is_rejected(shm_dir, dirs):
+    _, outside = dirs
+    (shm_dir / "frame-1").symlink_to(outside / "secret.jpg")
+    with pytest.raises(PermissionError):
+        resolve_local_image(None, "frame-1", [])
+
+
+@pytest.mark.parametrize("shm_name", ["", ".", "..", "../etc/passwd", "a/b"])
+def test_invalid_shm_name_is_rejected(shm_name):
+    with pytest.raises(ValueError):
+        resolve_local_image(None, shm_name, [])
+
+
+@pytest.mark.parametrize("image_path, shm_name", [(None, None), ("a.jpg", "frame-1")])
+def test_exactly_one_reference_is_required(image_path, shm_name):
+    with pytest.raises(ValueError):
+        resolve_local_image(image_path, shm_name, ["."])
+
+
+def test_decode_reads_regular_file(dirs):
+    allowed, _ = dirs
+    path = allowed / "real.png"
+    cv2.imwrite(str(path), np.zeros((8, 8, 3), dtype=np.uint8))
+    assert decode_image_file(path).shape == (8, 8, 3)
+
+
+def test_decode_refuses_symlink(dirs):
+    allowed, outside = dirs
+    link = allowed / "link.jpg"
+    link.symlink_to(outside / "secret.jpg")
+    with pytest.raises(OSError):
+        decode_image_file(link)
+
+
+def test_decode_rejects_fifo_without_blocking(shm_dir):
+    fifo = shm_dir / "frame-1"
+    os.mkfifo(fifo)
+    path = resolve_local_image(None, "frame-1", [])
+    with pytest.raises(ValueError):
+        decode_image_file(path)
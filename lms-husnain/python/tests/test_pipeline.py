@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.config.settings import settings
+from app.services import face_recognizer
+from app.services.face_recognizer import FaceRecognizer, stage_session_threads
+from app.services.pipeline import PipelineStage
+
+FAKEPACK = Path.home() / ".insightface" / "models" / "fakepack" / "rec.onnx"
+
+
+@pytest.fixture
+def stage():
+    stage = PipelineStage("test", workers=2, queue_size=2)
+    yield stage
+    stage.close()
+
+
+def test_stage_returns_results_in_call_order(stage):
+    async def main():
+        return await asyncio.gather(*(stage.run(pow, n, 2) for n in range(10)))
+
+    assert asyncio.run(main()) == [n**2 for n in range(10)]
+
+
+def test_stage_runs_on_its_worker_threads(stage):
+    name = asyncio.run(stage.run(lambda: threading.current_thread().name))
+    assert name.startswith("pipeline-test-")
+
+
+def test_stage_propagates_exceptions(stage):
+    def fail():
+        raise ValueError("bad frame")
+
+    with pytest.raises(ValueError, match="bad frame"):
+        asyncio.run(stage.run(fail))
+
+    # The worker survives and keeps serving
+    assert asyncio.run(stage.run(len, "ok")) == 2
+
+
+def test_stage_runs_workers_in_parallel_and_reports_metrics(stage):
+    async def main():
+        started = time.monotonic()
+        await asyncio.gather(*(stage.run(time.sleep, 0.2) for _ in range(4)))
+        return time.monotonic() - started
+
+    # Four 0.2 s jobs on two workers take two rounds, not four
+    assert asyncio.run(main()) < 0.6
+
+    metrics = stage.get_metrics()
+    assert metrics["workers"] == 2
+    assert metrics["queue_capacity"] == 2
+    assert metrics["queue_length"] == 0
+    assert metrics["completed"] == 4
+    assert 0 < metrics["utilization"] <= 1
+
+
+@pytest.fixture
+def stage_workers(monkeypatch):
+    monkeypatch.setattr(settings, "PIPELINE_DETECT_WORKERS", 3)
+    monkeypatch.setattr(settings, "PIPELINE_EMBED_WORKERS", 1)
+    monkeypatch.setattr(face_recognizer.os, "cpu_count", lambda: 8)
+
+
+def test_session_threads_split_cores_by_stage_workers(stage_workers):
+    assert stage_session_threads(settings.PIPELINE_DETECT_WORKERS) == 6
+    assert stage_session_threads(settings.PIPELINE_EMBED_WORKERS) == 2
+
+
+def test_session_threads_never_drop_below_one(stage_workers, monkeypatch):
+    monkeypatch.setattr(face_recognizer.os, "cpu_count", lambda: 1)
+    assert stage_session_threads(1) == 1
+
+
+@pytest.mark.skipif(not FAKEPACK.exists(), reason="fakepack model is not installed")
+def test_stage_session_is_rebuilt_with_sized_pool(stage_workers):
+    from insightface import model_zoo
+
+    model = model_zoo.get_model(str(FAKEPACK), providers=["CPUExecutionProvider"])
+    recognizer = FaceRecognizer.__new__(FaceRecognizer)
+    recognizer.app = SimpleNamespace(models={"recognition": model})
+
+    recognizer._size_session("recognition", settings.PIPELINE_EMBED_WORKERS)
+
+    options = model.session.get_session_options()
+    assert options.intra_op_num_threads == 2
+    size = model.input_size[0]
+    crop = np.zeros((size, size, 3), dtype=np.uint8)
+    assert model.get_feat([crop]).shape[0] == 1
@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.config.settings import settings
+from app.services import qos
+from app.services.qos import QoSController, QoSTier
+
+TIERS = [QoSTier("full", 1280, 640), QoSTier("half", 640, 320), QoSTier("low", 320, 160)]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(qos, "time", SimpleNamespace(monotonic=clock))
+    monkeypatch.setattr(settings, "QOS_ENABLED", True)
+    monkeypatch.setattr(settings, "QOS_QUEUE_HIGH", 2)
+    monkeypatch.setattr(settings, "QOS_QUEUE_LOW", 1)
+    monkeypatch.setattr(settings, "QOS_LATENCY_HIGH_MS", 1500.0)
+    monkeypatch.setattr(settings, "QOS_LATENCY_LOW_MS", 500.0)
+    monkeypatch.setattr(settings, "QOS_LATENCY_SMOOTHING", 0.5)
+    monkeypatch.setattr(settings, "QOS_MIN_DWELL_SECONDS", 3.0)
+    return clock
+
+
+def test_starts_at_full_quality(clock):
+    controller = QoSController(TIERS)
+    assert controller.begin().tier.name == "full"
+
+
+def test_queue_pressure_steps_down_one_tier_per_dwell(clock):
+    controller = QoSController(TIERS)
+    clock.now += 5
+    tickets = [controller.begin() for _ in range(3)]
+    assert [ticket.tier.name for ticket in tickets] == ["full", "full", "half"]
+
+    # Still under pressure, but inside the dwell window
+    clock.now += 1
+    assert controller.begin().tier.name == "half"
+
+    clock.now += 5
+    assert controller.begin().tier.name == "low"
+    assert controller.begin().tier.name == "low"  # No tier below the last
+
+
+def test_recovers_one_tier_at_a_time_once_load_falls(clock):
+    controller = QoSController(TIERS)
+    clock.now += 5
+    tickets = [controller.begin() for _ in range(3)]
+    assert controller.current_tier.name == "half"
+
+    clock.now += 5
+    for ticket in tickets:
+        ticket.started_at = clock.now  # Fast requests
+        controller.end(ticket)
+    assert controller.current_tier.name == "full"
+
+
+def test_high_latency_steps_down_without_queue_pressure(clock):
+    controller = QoSController(TIERS)
+    clock.now += 5
+    ticket = controller.begin()
+    clock.now += 4  # 4000 ms, smoothed to 2000 ms
+    controller.end(ticket)
+    assert controller.current_tier.name == "half"
+
+
+def test_disabled_controller_returns_to_full_quality(clock, monkeypatch):
+    controller = QoSController(TIERS)
+    clock.now += 5
+    [controller.begin() for _ in range(3)]
+    assert controller.current_tier.name == "half"
+
+    monkeypatch.setattr(settings, "QOS_ENABLED", False)
+    assert controller.begin().tier.name == "full"
+
+
+def test_metrics_count_requests_per_tier(clock):
+    controller = QoSController(TIERS)
+    clock.now += 5
+    [controller.begin() for _ in range(3)]
+
+    metrics = controller.get_metrics()
+    assert metrics["current_tier"] == "half"
+    assert metrics["in_flight"] == 3
+    assert metrics["tiers"]["full"]["requests"] == 2
+    assert metrics["tiers"]["half"]["requests"] == 1
+
+
+def test_default_tiers_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "QOS_DEGRADED_IMAGE_SIZES", [768, 512])
+    monkeypatch.setattr(settings, "QOS_DEGRADED_DET_SIZES", [480, 320])
+    tiers = qos.default_tiers()
+    assert [tier.name for tier in tiers] == ["full", "degraded-1", "degraded-2"]
+    assert tiers[0] == QoSTier("full", settings.MAX_IMAGE_SIZE, settings.DETECTION_SIZE)
+    assert (tiers[2].max_image_size, tiers[2].det_size) == (512, 320)
+
+
+def test_metrics_split_time_between_tiers(clock):
+    controller = QoSController(TIERS)
+    clock.now += 5
+    [controller.begin() for _ in range(3)]
+    clock.now += 2
+
+    tiers = controller.get_metrics()["tiers"]
+    assert tiers["full"]["seconds"] == pytest.approx(5)
+    assert tiers["half"]["seconds"] == pytest.approx(2)
+    assert tiers["low"]["seconds"] == 0
@@ -0,0 +1,87 @@
+import json
+import math
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from insightface.app.common import Face
+
+from app.api.routes import _face_hint_dict, _parse_face_hint
+from app.config.settings import settings
+from app.models.schemas import FaceHint
+from app.services.face_recognizer import FaceRecognizer
+from app.utils.image_utils import padded_roi, scale_box
+
+BOX = {"x": 100, "y": 50, "width": 40, "height": 20}
+
+
+def test_padded_roi_grows_box_on_every_side():
+    assert padded_roi((480, 640, 3), BOX, 0.5) == (80, 40, 160, 80)
+
+
+def test_padded_roi_clips_to_image():
+    box = {"x": -10, "y": 460, "width": 40, "height": 40}
+    assert padded_roi((480, 640, 3), box, 0.5) == (0, 440, 50, 480)
+
+
+def test_padded_roi_outside_image_is_none():
+    box = {"x": 700, "y": 10, "width": 20, "height": 20}
+    assert padded_roi((480, 640, 3), box, 0.5) is None
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+def test_padded_roi_non_finite_is_none(value):
+    assert padded_roi((480, 640, 3), dict(BOX, width=value), 0.5) is None
+
+
+def test_scale_box_scales_every_field():
+    assert scale_box(BOX, 0.5) == {"x": 50, "y": 25, "width": 20, "height": 10}
+
+
+@pytest.mark.parametrize("value", ["NaN", "Infinity", "-Infinity"])
+def test_non_finite_hint_is_rejected(value):
+    face_hint = f'{{"x": {value}, "y": 0, "width": 10, "height": 10}}'
+    with pytest.raises(HTTPException) as error:
+        _parse_face_hint(face_hint)
+    assert error.value.status_code == 400
+
+    hint = FaceHint(x=0, y=0, width=float(value), height=10)
+    with pytest.raises(HTTPException):
+        _face_hint_dict(hint)
+
+
+def test_finite_hint_is_accepted():
+    hint = _parse_face_hint(json.dumps(BOX))
+    assert hint == {key: float(value) for key, value in BOX.items()}
+
+
+def test_detect_face_in_hint_maps_back_to_full_frame(monkeypatch):
+    monkeypatch.setattr(settings, "ROI_HINT_PADDING", 0.5)
+    recognizer = FaceRecognizer.__new__(FaceRecognizer)
+    crops = []
+
+    def detect_faces(crop, det_size=None):
+        crops.append(crop.shape[:2])
+        return [
+            Face(
+                bbox=np.array([5, 5, 15, 15], dtype=np.float32),
+                kps=np.array([[8, 8], [12, 8]], dtype=np.float32),
+                det_score=0.9,
+            ),
+            Face(
+                bbox=np.array([0, 0, 30, 20], dtype=np.float32),
+                kps=np.array([[10, 10], [20, 10]], dtype=np.float32),
+                det_score=0.8,
+            ),
+        ]
+
+    monkeypatch.setattr(recognizer, "detect_faces", detect_faces)
+    rgb_image = np.zeros((240, 320, 3), dtype=np.uint8)
+
+    # The hint is in original pixels; the image was resized by half
+    hint = {"x": 200, "y": 100, "width": 80, "height": 40}
+    face = recognizer.detect_face_in_hint(rgb_image, hint, 0.5)
+
+    assert crops == [(40, 80)]  # (80, 40)-(160, 80) after padding
+    assert face.bbox.tolist() == [80, 40, 110, 60]  # Largest face, shifted
+    assert face.kps.tolist() == [[90, 50], [100, 50]]
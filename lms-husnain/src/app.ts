@@ -12,10 +12,28 @@ import enrollmentRoutes from "./routes/enrollments";
 import dashboardRoute from "./routes/dashboard";
 import lectureRoutes from "./routes/lectureRoutes";
 import attendanceRoutes from "./routes/attendance";
+import { FaceService } from "./services/faceService";
 dotenv.config();
 
 const app = express();
 const PORT = process.env.PORT || 5000;
+const GALLERY_SYNC_RETRIES = 5;
+const GALLERY_SYNC_RETRY_MS = 10000;
+
+// Loads stored faces into the face service's duplicate-screening gallery,
+// retrying while the face service is still starting up
+async function syncFaceGallery(attempt = 1): Promise<void> {
+  try {
+    await FaceService.syncGallery();
+  } catch (error: any) {
+    if (attempt >= GALLERY_SYNC_RETRIES) {
+      console.error("❌ Face gallery sync failed:", error.message);
+      return;
+    }
+    console.warn(`⚠️ Face gallery sync attempt ${attempt} failed, retrying...`);
+    setTimeout(() => syncFaceGallery(attempt + 1), GALLERY_SYNC_RETRY_MS);
+  }
+}
 
 app.use(helmet());
 
@@ -72,4 +90,5 @@ app.use(
 app.listen(PORT, () => {
   console.log(`🚀 Server running on port ${PORT}`);
   console.log(`📂 Uploads served at: http://localhost:${PORT}/uploads`);
+  syncFaceGallery();
 });
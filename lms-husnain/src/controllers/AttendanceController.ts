@@ -38,9 +38,9 @@ export class AttendanceController {
         ? rawScheduleId.replace("weekly-", "").replace("date-", "")
         : null;
 
-      const uploadedFile = req.file;
+      const uploadedFiles = (req.files as Express.Multer.File[]) || [];
 
-      if (!courseId || !uploadedFile) {
+      if (!courseId || uploadedFiles.length === 0) {
         return res
           .status(400)
           .json({ error: "Missing required fields (courseId or image)." });
@@ -82,9 +82,13 @@ export class AttendanceController {
       // 4. Verify Face with AI
       try {
         const formData = new FormData();
-        formData.append("image", uploadedFile.buffer, {
-          filename: "face-scan.jpg",
-          contentType: uploadedFile.mimetype,
+        // Every frame of the burst goes in one request; the face service
+        // verifies the sharpest first and stops at the first match
+        uploadedFiles.forEach((file, index) => {
+          formData.append("image", file.buffer, {
+            filename: `face-scan-${index}.jpg`,
+            contentType: file.mimetype,
+          });
         });
 
         formData.append("student_id", studentId);
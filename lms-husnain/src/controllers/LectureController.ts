@@ -17,7 +17,7 @@ export class LectureController {
 
       const teacherId = (req as any).user?.userId;
       const { courseId } = req.body;
-      const uploadedFile = req.file;
+      const uploadedFiles = (req.files as Express.Multer.File[]) || [];
 
       // Clean ID
       const rawScheduleId = req.body.scheduleId || req.body.schedule_id;
@@ -25,7 +25,7 @@ export class LectureController {
         ? rawScheduleId.replace("weekly-", "").replace("date-", "") 
         : null;
 
-      if (!courseId || !uploadedFile) {
+      if (!courseId || uploadedFiles.length === 0) {
         return res.status(400).json({ error: "Course ID and Face Image are required." });
       }
 
@@ -52,9 +52,12 @@ export class LectureController {
       // 3. Verify with Python
       try {
         const formData = new FormData();
-        formData.append('image', uploadedFile.buffer, {
-          filename: 'teacher-face.jpg',
-          contentType: uploadedFile.mimetype,
+        // One part per burst frame; the face service stops at the first match
+        uploadedFiles.forEach((file, index) => {
+          formData.append('image', file.buffer, {
+            filename: `teacher-face-${index}.jpg`,
+            contentType: file.mimetype,
+          });
         });
         
         formData.append('student_id', teacherId); // Log identifier
@@ -5,6 +5,7 @@ import { eq } from "drizzle-orm";
 import FormData from "form-data";
 import axios from "axios";
 import fs from "fs";
+import { FaceService } from "../services/faceService";
 
 export class UserController {
 
@@ -27,6 +28,10 @@ export class UserController {
           filename: file.originalname,
           contentType: file.mimetype,
         });
+        // Lets the face service archive the aligned crop for future re-embedding
+        formData.append('user_id', userId);
+        // Screens the new face against every registered face (see FaceService.syncGallery)
+        formData.append('screen_duplicates', 'true');
 
         const aiResponse = await axios.post("http://localhost:8000/generate-embedding", formData, {
           headers: { ...formData.getHeaders() },
@@ -35,6 +40,14 @@ export class UserController {
         if (aiResponse.data.success) {
           faceEmbedding = aiResponse.data.embedding; // Array of 512 floats
           console.log(`✅ Face ID generated for User ${userId}`);
+
+          if (aiResponse.data.duplicates?.length) {
+            console.warn(`⚠️ Face of User ${userId} is already registered to:`, aiResponse.data.duplicates);
+          }
+          if (aiResponse.data.templates_screened === 0) {
+            // The face service restarted since the last sync; reload in the background
+            FaceService.syncGallery().catch((error) => console.error("Face gallery sync failed:", error));
+          }
         } else {
           console.warn("⚠️ AI Service Warning:", aiResponse.data.message);
           // Optional: Return error if you want to enforce strict "Face required on profile"
@@ -59,6 +72,11 @@ export class UserController {
         })
         .where(eq(usersTable.id, userId));
 
+      if (faceEmbedding) {
+        // Screen later registrations against the saved face too
+        await FaceService.addGalleryTemplate(userId, faceEmbedding);
+      }
+
       res.json({
         success: true,
         message: "Profile picture updated and Face ID registered successfully.",
@@ -1,3 +1,4 @@
+import { randomUUID } from "crypto";
 import { eq } from "drizzle-orm";
 import { Request, Response } from "express";
 import jwt from "jsonwebtoken";
@@ -43,10 +44,22 @@ export class AuthController {
         });
       }
 
+      // Generate the ID up front so the face service can archive the
+      // enrollment crop under it (needed to re-embed after a model change)
+      const userId = randomUUID();
+
       let faceEmbedding: number[] | null = null;
-      const faceResult = await FaceService.detectFace(faceImage.buffer);
+      const faceResult = await FaceService.detectFace(faceImage.buffer, userId, true);
       console.log("Face detection result:", faceResult);
 
+      if (faceResult.duplicates?.length) {
+        console.warn(`⚠️ Face of new User ${userId} is already registered to:`, faceResult.duplicates);
+      }
+      if (faceResult.templates_screened === 0) {
+        // The face service restarted since the last sync; reload in the background
+        FaceService.syncGallery().catch((error) => console.error("Face gallery sync failed:", error));
+      }
+
       if (!faceResult.success || !faceResult.embedding) {
         return res.status(400).json({
           error: "Face detection failed",
@@ -62,6 +75,7 @@ export class AuthController {
       const [newUser] = await db
         .insert(usersTable)
         .values({
+          id: userId,
           email,
           password: hashedPassword,
           role,
@@ -74,6 +88,9 @@ export class AuthController {
         })
         .returning();
 
+      // Screen later registrations against this face too
+      await FaceService.addGalleryTemplate(newUser.id, faceEmbedding);
+
       // ✅ FIX: Passed newUser.id as the 3rd argument
       await EmailService.sendVerificationEmail(
         email,
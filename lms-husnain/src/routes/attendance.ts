@@ -9,15 +9,18 @@ const router = express.Router();
 const storage = multer.memoryStorage();
 const upload = multer({ storage: storage });
 
+// Matches BURST_MAX_FRAMES in the face service
+const MAX_BURST_FRAMES = 5;
+
 // ==========================================
 // 🎓 STUDENT ROUTES
 // ==========================================
 
-// 1. Mark Attendance (Upload Face Image)
+// 1. Mark Attendance (Upload Face Image, or a short burst of frames)
 router.post(
   "/markAttendance",
   authenticateToken,
-  upload.single("image"), 
+  upload.array("image", MAX_BURST_FRAMES),
   AttendanceController.markAttendance
 );
 
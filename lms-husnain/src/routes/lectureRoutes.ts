@@ -9,10 +9,13 @@ const router = Router();
 const storage = multer.memoryStorage();
 const upload = multer({ storage: storage });
 
+// Matches BURST_MAX_FRAMES in the face service
+const MAX_BURST_FRAMES = 5;
+
 router.post(
   "/startLectureWithFaceVerification",
   authenticateToken, 
-  upload.single("image"), // ✅ REQUIRED: This processes the file upload
+  upload.array("image", MAX_BURST_FRAMES), // ✅ REQUIRED: One image or a burst of frames
   LectureController.startLectureWithFaceVerification
 );
 
@@ -1,17 +1,35 @@
+import { isNotNull } from "drizzle-orm";
+import { db } from "../config/database";
+import { usersTable } from "../db/schema";
 import { FaceDetectionResponse, FaceVerificationResponse } from "../types/auth";
 
 const FACE_SERVICE_URL =
   process.env.FACE_SERVICE_URL || "http://localhost:8000";
+const GALLERY_BATCH_SIZE = 1000;
 
 export class FaceService {
-  
+  private static gallerySync: Promise<number> | null = null;
+
   // ✅ FIX: Increased timeout to 60 seconds (60000ms)
   // AI models often take 15-30s to load on the first request.
-  static async detectFace(imageBuffer: Buffer): Promise<FaceDetectionResponse> {
+  // Pass userId to have the face service archive the aligned crop under it,
+  // so the template can be regenerated after a recognition model change.
+  // With screenDuplicates, the face is also checked against the gallery
+  static async detectFace(
+    imageBuffer: Buffer,
+    userId?: string,
+    screenDuplicates = false
+  ): Promise<FaceDetectionResponse> {
     try {
       const formData = new FormData();
       const blob = new Blob([imageBuffer], { type: "image/jpeg" });
       formData.append("image", blob, "image.jpg");
+      if (userId) {
+        formData.append("user_id", userId);
+      }
+      if (screenDuplicates) {
+        formData.append("screen_duplicates", "true");
+      }
 
       const response = await fetch(`${FACE_SERVICE_URL}/detect-face`, {
         method: "POST",
@@ -32,6 +50,8 @@ export class FaceService {
         embedding: data.embedding,
         confidence: data.confidence,
         message: data.message,
+        duplicates: data.duplicates,
+        templates_screened: data.templates_screened,
       };
     } catch (error: any) { // Typed as any to access error properties safely
       console.error("Face detection error:", error);
@@ -136,4 +156,64 @@ export class FaceService {
       };
     }
   }
-}
\ No newline at end of file
+
+  // Adds one saved template to the face service's duplicate-screening
+  // gallery. Call it only after the embedding is stored in the database
+  static async addGalleryTemplate(userId: string, embedding: number[]): Promise<void> {
+    try {
+      await FaceService.postGalleryTemplates([{ template_id: userId, embedding }]);
+    } catch (error) {
+      console.error(`Failed to add User ${userId} to the face gallery:`, error);
+    }
+  }
+
+  // Loads every stored embedding into the face service's in-memory gallery.
+  // The gallery is empty whenever the face service (re)starts, so this runs
+  // at startup and again whenever a screen reports an empty gallery.
+  // Concurrent callers share one sync. Resolves to the gallery size
+  static syncGallery(): Promise<number> {
+    if (!FaceService.gallerySync) {
+      FaceService.gallerySync = FaceService.loadGallery().finally(() => {
+        FaceService.gallerySync = null;
+      });
+    }
+    return FaceService.gallerySync;
+  }
+
+  private static async loadGallery(): Promise<number> {
+    const rows = await db
+      .select({ id: usersTable.id, faceEmbedding: usersTable.faceEmbedding })
+      .from(usersTable)
+      .where(isNotNull(usersTable.faceEmbedding));
+
+    let total = 0;
+    for (let i = 0; i < rows.length; i += GALLERY_BATCH_SIZE) {
+      const templates = rows.slice(i, i + GALLERY_BATCH_SIZE).map((row) => ({
+        template_id: row.id,
+        embedding: row.faceEmbedding as number[],
+      }));
+      total = await FaceService.postGalleryTemplates(templates);
+    }
+
+    console.log(`✅ Face gallery synced: ${total} templates`);
+    return total;
+  }
+
+  private static async postGalleryTemplates(
+    templates: { template_id: string; embedding: number[] }[]
+  ): Promise<number> {
+    const response = await fetch(`${FACE_SERVICE_URL}/gallery/templates`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ templates }),
+      signal: AbortSignal.timeout(60000),
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const data = (await response.json()) as { templates: number };
+    return data.templates;
+  }
+}
@@ -41,11 +41,18 @@ export interface JWTPayload {
   role: "student" | "teacher";
 }
 
+export interface GalleryMatch {
+  template_id: string;
+  similarity: number;
+}
+
 export interface FaceDetectionResponse {
   success: boolean;
   embedding?: number[];
   confidence?: number;
   message?: string;
+  duplicates?: GalleryMatch[] | null;
+  templates_screened?: number | null;
 }
 
 export interface FaceVerificationResponse {